@@ -0,0 +1,165 @@
+#!/usr/bin/python3
+
+"""
+Worst-case benchmark: conversion of generated inputs that used to make
+the conversion super-linear, e.g. huge lines, minified sources, deep
+nesting, and thousands of colons or aliases, and the outline of block
+headers with long qualified names.
+
+Usage:
+    python3 bench/adversarial.py [--scale N] [--seed N] [--slack X]
+
+Each case is generated at a small and at a large size, where the large
+size is SCALE times the small one, and it is converted in both
+directions where its syntax allows. Random fill is drawn from a seeded
+generator. The time of the large input must stay within SLACK times the
+linear extrapolation of the small one, otherwise the case fails and the
+exit status is nonzero.
+"""
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import thinc
+
+
+def words(rng, N):
+    return " ".join(rng.choice(["a", "bc", "x1", "(y)", "z[2]", "k->m", "1.5"]) for n in range(N))
+
+
+def trailing_space(rng, N):
+    """One huge line with runs of spaces and tabs inside and after it."""
+    return "int x = " + " \t ".join(words(rng, 1) for n in range(N)) + ";" + " \t"*N + "\n", True
+
+
+def minified(rng, N):
+    """A whole program on one line."""
+    return "".join("int f%d(int a){if(a){return %s;}do{a--;}while(a>0);return 0;}" % (n, words(rng, 2).replace(" ", "+"))
+        for n in range(N)) + "\n", True
+
+
+def deep_curly(rng, N):
+    """Blocks nested N deep, without indentation."""
+    return "void f() {\n" + "if (a) {\n"*N + "x++;\n" + "}\n"*N + "}\n", True
+
+
+def deep_indented(rng, N):
+    """Indented blocks nested N deep."""
+    return "void f():\n" + "".join("    "*d + "if (a):\n" for d in range(1, N + 1)) + "    "*(N + 1) + "x++\n", False
+
+
+def colons_curly(rng, N):
+    """A switch with N cases, and lines that end in colons."""
+    return ("int f(int v) {\n    switch (v) {\n"
+        + "".join("        case %d:\n            v = v ? %s : 0;\n            break;\n" % (n, words(rng, 1)) for n in range(N))
+        + "        default:\n            break;\n    }\n    return v;\n}\n"), True
+
+
+def colons_indented(rng, N):
+    """A switch with N cases in indented syntax."""
+    return ("int f(int v):\n    switch (v):\n"
+        + "".join("        case %d:\n            v = v ? %s : 0\n            break\n" % (n, words(rng, 1)) for n in range(N))
+        + "        default:\n            break\n    return v\n"), False
+
+
+def access_sections(rng, N):
+    """A class with N access sections."""
+    return ("class C {\n"
+        + "".join("    %s:\n        int m%d;\n" % (rng.choice(["public", "private", "protected"]), n) for n in range(N))
+        + "};\n"), True
+
+
+def aliases_curly(rng, N):
+    """Structures with thousands of aliases."""
+    return "struct S {\n    int a;\n} " + ", ".join("s%d" % n for n in range(N)) + ";\n", True
+
+
+def aliases_indented(rng, N):
+    """Structures with thousands of aliases in indented syntax."""
+    return "struct S, " + ", ".join("s%d" % n for n in range(N)) + ":\n    int a\n", False
+
+
+def many_aliases(rng, N):
+    """N structures, each with an alias."""
+    return "".join("struct S%d {\n    int a;\n} s%d;\n" % (n, n) for n in range(N)), True
+
+
+def do_while(rng, N):
+    """N do-while loops with long conditions."""
+    return "".join("do {\n    x++;\n} while (%s);\n" % " && ".join(words(rng, 1) for m in range(20)) for n in range(N)), True
+
+
+def long_do_while(rng, N):
+    """One do-while loop with a huge condition."""
+    return "do while (" + " && ".join(words(rng, 1) for n in range(N)) + "):\n    x++\n", False
+
+
+def qualified_names(rng, N):
+    """Outline of block headers with N-fold qualified names."""
+    return ("a::"*N + "a\n{\n}\n" + "a::"*N + "f(int a) {\n}\n"
+        + "struct S " + "a::"*N + "s = {\n    1\n};\n"), True
+
+
+CASES = [
+    (trailing_space, 2000, thinc.convert),
+    (minified, 200, thinc.convert),
+    (deep_curly, 100, thinc.convert),
+    (deep_indented, 100, thinc.convert),
+    (colons_curly, 200, thinc.convert),
+    (colons_indented, 200, thinc.convert),
+    (access_sections, 200, thinc.convert),
+    (aliases_curly, 2000, thinc.convert),
+    (aliases_indented, 2000, thinc.convert),
+    (many_aliases, 200, thinc.convert),
+    (do_while, 200, thinc.convert),
+    (long_do_while, 2000, thinc.convert),
+    (qualified_names, 2000, thinc.outline),
+]
+
+
+def best_s(func, runs=3):
+    times = []
+    for n in range(runs):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv):
+    scale = 8
+    seed = 0
+    slack = 2.5
+    for n in range(len(argv)):
+        if argv[n] == "--scale":
+            scale = int(argv[n+1])
+        elif argv[n] == "--seed":
+            seed = int(argv[n+1])
+        elif argv[n] == "--slack":
+            slack = float(argv[n+1])
+
+    failed = 0
+    print("%-18s %9s %10s %10s %7s" % ("case", "bytes", "small", "large", "ratio"))
+    for gen, N, func in CASES:
+        small, make_indented = gen(random.Random(seed), N)
+        large, make_indented = gen(random.Random(seed), N*scale)
+        t_small = best_s(lambda: func(small, make_indented))
+        t_large = best_s(lambda: func(large, make_indented), 1)
+        # Compare the time per byte, so that the sizes need not scale
+        # exactly with N.
+        ratio = (t_large/len(large)) / (t_small/len(small))
+        isOk = ratio <= slack
+        failed += not isOk
+        print("%-18s %9d %8.1f ms %8.1f ms %6.2fx %s" % (gen.__name__, len(large),
+            1000*t_small, 1000*t_large, ratio, "" if isOk else "FAIL"))
+    print("%d of %d cases exceed %.1f times the linear budget" % (failed, len(CASES), slack))
+    return failed > 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
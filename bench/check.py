@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+
+"""
+Check mode benchmark: the time of check_project() on a tree whose
+outputs are up to date, compared with converting the tree.
+
+Usage:
+    python3 bench/check.py [-n RUNS] [--copies N]
+
+The tree is built from copies of the sources in test/, in indented
+syntax, each of which includes a header from an include directory
+outside of the tree. After the timed runs, a statement macro of that
+header is changed, and check_project() must then report every output as
+stale. The exit status is nonzero if it does not, or if checking is not
+faster than converting.
+"""
+
+import os
+import sys
+import tempfile
+
+from common import best_ms, test_sources, thinc
+
+
+def main(argv):
+    runs = 3
+    copies = 20
+    for n in range(len(argv)):
+        if argv[n] == "-n":
+            runs = int(argv[n+1])
+        elif argv[n] == "--copies":
+            copies = int(argv[n+1])
+
+    sources = [thinc.convert(code, True) for code in test_sources()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src_dir = os.path.join(tmp, "src")
+        out_dir = os.path.join(tmp, "out")
+        ext_dir = os.path.join(tmp, "ext")
+        os.makedirs(src_dir)
+        os.makedirs(ext_dir)
+        thinc.writeFile(os.path.join(ext_dir, "ext.h"), "#define DO_IT x = 1\n")
+        for n in range(copies):
+            for m, code in enumerate(sources):
+                thinc.writeFile(os.path.join(src_dir, "f%d_%d.c.ic" % (n, m)),
+                    "#include <ext.h>\nvoid do_it%d():\n    DO_IT\n" % m + code)
+
+        def _index():
+            return thinc.MacroIndex([ext_dir])
+
+        def _convert():
+            # Without the state of the last run, every file is converted.
+            if os.path.exists(os.path.join(out_dir, ".thinc-state.json")):
+                os.remove(os.path.join(out_dir, ".thinc-state.json"))
+            thinc.convert_project(src_dir, out_dir, False, jobs=1, macro_index=_index())
+
+        convert_ms = best_ms(_convert, runs)
+        check_ms = best_ms(lambda: thinc.check_project(src_dir, out_dir, False, jobs=1, macro_index=_index()), runs)
+
+        # A macro that now ends in a semi-colon changes every output.
+        thinc.writeFile(os.path.join(ext_dir, "ext.h"), "#define DO_IT x = 1;\n")
+        stale, checked = thinc.check_project(src_dir, out_dir, False, jobs=1, macro_index=_index())
+
+    print("%-10s %9s" % ("mode", "time"))
+    print("%-10s %6.1f ms" % ("convert", convert_ms))
+    print("%-10s %6.1f ms" % ("check", check_ms))
+    print("%d files, %d of them stale after changing the external header" % (checked, len(stale)))
+    return check_ms >= convert_ms or len(stale) != checked
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,51 @@
+"""
+Helpers of the benchmarks in bench/. Importing this module puts the root
+of the repository on the module path, so that the benchmarks can then
+import thinc.
+"""
+
+import gc
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import thinc
+
+
+def best_ms(func, runs, collect=True):
+    """The shortest time of several calls of func, in milliseconds.
+
+    args:
+        func: The function to time, which is called without arguments.
+        runs: The number of calls.
+        collect: False to disable the garbage collector during the
+            calls, where it would mostly measure the size of the sample.
+    """
+    times = []
+    if not collect:
+        gc.collect()
+        gc.disable()
+    try:
+        for n in range(runs):
+            t0 = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - t0)
+    finally:
+        if not collect:
+            gc.enable()
+    return 1000*min(times)
+
+
+def test_sources():
+    """The sources in test/, in the order of their filenames."""
+    test_dir = os.path.join(ROOT, "test")
+    return [thinc.readFile(os.path.join(test_dir, fn)) for fn in sorted(os.listdir(test_dir))]
+
+
+def sample(copies):
+    """A large source of curly braces syntax, made of copies of the
+    sources in test/."""
+    return "\n".join(test_sources()*copies)
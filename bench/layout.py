@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+
+"""
+Layout benchmark: the time of cosmetic_lines() on a very large output,
+with the pure Python layout of blank lines and with the NumPy one.
+
+Usage:
+    python3 bench/layout.py [-n RUNS] [--copies N]
+
+The sample is built from copies of the sources in test/, converted into
+indented syntax. Both layouts must give the same lines. The exit status
+is nonzero if they differ, or if NumPy is not installed.
+"""
+
+import sys
+
+from common import best_ms, sample, thinc
+
+
+def main(argv):
+    runs = 5
+    copies = 2000
+    for n in range(len(argv)):
+        if argv[n] == "-n":
+            runs = int(argv[n+1])
+        elif argv[n] == "--copies":
+            copies = int(argv[n+1])
+
+    curly = sample(copies)
+
+    # The input of cosmetic_lines(), see convert_tree().
+    make_indented, macros, tree, bcoms, coms = thinc.parse_tree(curly, True)
+    c8, mv1, mv2 = thinc.transform(tree, make_indented)
+    code = thinc.block_comments_expand(thinc.merge_comments(c8, bcoms, coms, {**mv1, **mv2}), curly)
+
+    if thinc.layout_numpy(code[:1]) is None:
+        print("NumPy is not installed")
+        return 1
+
+    results = []
+    for name, min_lines in (("python", float("inf")), ("numpy", 0)):
+        thinc.NUMPY_MIN_LINES = min_lines
+        # cosmetic_lines() extends the lines of aliases in place, so
+        # every run gets its own copy of the lines.
+        copies_of_code = [[list(line) for line in code] for n in range(runs)]
+        ms = best_ms(lambda: thinc.cosmetic_lines(copies_of_code.pop()), runs, collect=False)
+        lines = thinc.code_join(thinc.cosmetic_lines([list(line) for line in code]), curly)
+        results.append((name, ms, lines))
+
+    layout_py = best_ms(lambda: thinc.layout_python(code), runs, collect=False)
+    layout_np = best_ms(lambda: thinc.layout_numpy(code), runs, collect=False)
+
+    print("%d lines" % len(code))
+    print("%-16s %9s %9s" % ("", "python", "numpy"))
+    print("%-16s %6.1f ms %6.1f ms" % ("layout", layout_py, layout_np))
+    print("%-16s %6.1f ms %6.1f ms" % ("cosmetic_lines", results[0][1], results[1][1]))
+    isSame = results[0][2] == results[1][2]
+    print("outputs are %s" % ("identical" if isSame else "DIFFERENT"))
+    return not isSame
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+
+"""
+Lean conversion benchmark: the time to convert a large source with the
+full pipeline, convert(), and with convert_lean(), which drops comments
+and skips the cosmetic passes.
+
+Usage:
+    python3 bench/lean.py [-n RUNS] [--copies N]
+
+The sample is built from copies of the sources in test/, and it is
+converted in both directions. The exit status is nonzero if the lean
+conversion is not faster than the full one.
+"""
+
+import sys
+
+from common import best_ms, sample, thinc
+
+
+def main(argv):
+    runs = 5
+    copies = 200
+    for n in range(len(argv)):
+        if argv[n] == "-n":
+            runs = int(argv[n+1])
+        elif argv[n] == "--copies":
+            copies = int(argv[n+1])
+
+    curly = sample(copies)
+    indented = thinc.convert(curly, True)
+
+    isFaster = True
+    print("%-10s %9s %9s %8s" % ("direction", "full", "lean", "speedup"))
+    for name, code, make_indented in (("to THINC", curly, True), ("to C/C++", indented, False)):
+        full = best_ms(lambda: thinc.convert(code, make_indented), runs)
+        lean = best_ms(lambda: thinc.convert_lean(code, make_indented), runs)
+        print("%-10s %6.1f ms %6.1f ms %7.2fx" % (name, full, lean, full/lean))
+        isFaster = isFaster and lean < full
+    print("%d lines per direction" % thinc.count_lines(curly))
+    return not isFaster
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+
+"""
+Outline benchmark: the time to list the symbols of a large source with
+outline(), compared with the time to convert it with convert().
+
+Usage:
+    python3 bench/outline.py [-n RUNS] [--copies N]
+
+The sample is built from copies of the sources in test/, and it is
+outlined in both syntaxes. The exit status is nonzero if outline() is
+not faster than convert().
+"""
+
+import sys
+
+from common import best_ms, sample, thinc
+
+
+def main(argv):
+    runs = 5
+    copies = 20
+    for n in range(len(argv)):
+        if argv[n] == "-n":
+            runs = int(argv[n+1])
+        elif argv[n] == "--copies":
+            copies = int(argv[n+1])
+
+    curly = sample(copies)
+    indented = thinc.convert(curly, True)
+
+    isFaster = True
+    print("%-10s %9s %9s %8s" % ("syntax", "convert", "outline", "speedup"))
+    for name, code, make_indented in (("C/C++", curly, True), ("THINC", indented, False)):
+        full = best_ms(lambda: thinc.convert(code, make_indented), runs)
+        fast = best_ms(lambda: thinc.outline(code, make_indented), runs)
+        print("%-10s %6.1f ms %6.1f ms %7.2fx" % (name, full, fast, full/fast))
+        isFaster = isFaster and fast < full
+
+    cache = thinc.LRUCache()
+    thinc.outline(curly, True, cache)
+    cached = best_ms(lambda: thinc.outline(curly, True, cache), runs)
+    print("%-10s %16.3f ms" % ("cached", cached))
+    print("%d symbols in %d lines" % (len(thinc.outline(curly, True)), thinc.count_lines(curly)))
+    return not isFaster
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+
+"""
+Cold-start benchmark: the time to convert a trivial file with a fresh
+interpreter, which is how make rules call thinc once per file.
+
+Usage:
+    python3 bench/startup.py [-n RUNS] [--budget MILLISECONDS]
+
+The script form, "python3 -m thinc", and a zip application built with
+"--zipapp" are measured. The script and module forms import thinclib.py
+from its cached bytecode, which is written before the timed runs. The
+script form is also measured without a bytecode cache, as where the
+cache can not be written, which is the case the zip application is for.
+
+The budget is the time on top of starting the interpreter, i.e. of
+"python3 -c pass", so that it does not depend on the speed of the
+machine. The exit status is nonzero if the fastest form exceeds the
+budget, or if the zip application is not faster than the script form
+without a bytecode cache.
+"""
+
+import os
+import sys
+import subprocess
+import statistics
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, "test", "HelloWorld.c")
+
+
+def median_ms(cmd, runs, env=None):
+    times = []
+    for n in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, check=True, env=env)
+        times.append(time.perf_counter() - t0)
+    return 1000*statistics.median(times)
+
+
+def main(argv):
+    runs = 20
+    budget = 15.0
+    for n in range(len(argv)):
+        if argv[n] == "-n":
+            runs = int(argv[n+1])
+        elif argv[n] == "--budget":
+            budget = float(argv[n+1])
+
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    with tempfile.TemporaryDirectory() as tmp:
+        pyz = os.path.join(tmp, "thinc.pyz")
+        subprocess.run([sys.executable, os.path.join(ROOT, "thinc.py"), "--zipapp", pyz], check=True)
+        # warm up the bytecode cache of thinclib.py
+        subprocess.run([sys.executable, "-m", "thinc", "-i", SAMPLE], stdout=subprocess.DEVNULL, env=env)
+        # An empty cache directory that is never written.
+        env_no_cache = {**env, "PYTHONDONTWRITEBYTECODE": "1", "PYTHONPYCACHEPREFIX": os.path.join(tmp, "pycache")}
+
+        results = [
+            ("interpreter only", median_ms([sys.executable, "-c", "pass"], runs)),
+            ("python3 thinc.py", median_ms([sys.executable, os.path.join(ROOT, "thinc.py"), "-i", SAMPLE], runs, env)),
+            ("python3 -m thinc", median_ms([sys.executable, "-m", "thinc", "-i", SAMPLE], runs, env)),
+            ("python3 thinc.pyz", median_ms([sys.executable, pyz, "-i", SAMPLE], runs)),
+            ("thinc.py, no cache", median_ms([sys.executable, os.path.join(ROOT, "thinc.py"), "-i", SAMPLE], runs, env_no_cache)),
+        ]
+
+    for name, ms in results:
+        print("%-20s %7.1f ms" % (name, ms))
+    interpreter = results[0][1]
+    overhead = min(ms for name, ms in results[1:]) - interpreter
+    print("fastest conversion %.1f ms over the interpreter, budget %.1f ms" % (overhead, budget))
+    return overhead > budget or results[3][1] >= results[4][1]
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
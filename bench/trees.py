@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+
+"""
+Tree snapshot benchmark: the time to parse a large source into a tree,
+compared with the time to save and load its snapshot.
+
+Usage:
+    python3 bench/trees.py [-n RUNS] [--copies N]
+
+The sample is built from copies of the sources in test/, in both
+syntaxes. The exit status is nonzero if loading a snapshot is not
+faster than parsing the source.
+"""
+
+import sys
+
+from common import best_ms, sample, thinc
+
+
+def main(argv):
+    runs = 5
+    copies = 200
+    for n in range(len(argv)):
+        if argv[n] == "-n":
+            runs = int(argv[n+1])
+        elif argv[n] == "--copies":
+            copies = int(argv[n+1])
+
+    curly = sample(copies)
+    indented = thinc.convert(curly, True)
+
+    isFaster = True
+    print("%-8s %9s %9s %9s %9s %9s" % ("syntax", "parse", "save", "load", "convert", "from tree"))
+    for name, code, make_indented in (("C/C++", curly, True), ("THINC", indented, False)):
+        key = thinc.tree_key(code, make_indented)
+        snapshot = thinc.parse_tree(code, make_indented)
+        data = thinc.tree_dumps(snapshot, key)
+        parse = best_ms(lambda: thinc.parse_tree(code, make_indented), runs)
+        save = best_ms(lambda: thinc.tree_dumps(snapshot, key), runs)
+        load = best_ms(lambda: thinc.tree_loads(data, key), runs)
+        full = best_ms(lambda: thinc.convert(code, make_indented), runs)
+        tree = best_ms(lambda: thinc.code_join(thinc.convert_tree(thinc.tree_loads(data, key), code), code), runs)
+        print("%-8s %6.1f ms %6.1f ms %6.1f ms %6.1f ms %6.1f ms" % (name, parse, save, load, full, tree))
+        isFaster = isFaster and load < parse
+    print("%d lines per syntax, %d bytes per snapshot" % (thinc.count_lines(curly), len(data)))
+    return not isFaster
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
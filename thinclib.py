@@ -0,0 +1,3784 @@
+#!/usr/bin/python3
+
+"""
+
+Procedure Outline:
+==================
+
+1) A source file is read and split into three objects. The objects
+contain code, block comments, and line comments. Each object is in
+"line-referenced data format" (see Data Formats).
+
+2) Source code is converted into the "tree-format" (see Data Formats).
+
+3) Transformations of code are performed while it is in the tree-format.
+
+4) Code is converted back into line-referenced data format with the
+addition of either indentation syntax or curly braces syntax.
+
+5) Using the line references, code, is recombined with block comments,
+and line comments.
+
+6) Block comments are unrolled.
+
+7) Code is beautified
+
+8) Lines are joined into a single string
+
+
+Data Formats:
+=============
+
+Line-referenced data format:
+----------------------------
+Code
+^^^^
+    [
+        [line_number, code],
+        [line_number, code],
+        ...
+    ]
+
+Block Comments
+^^^^^^^^^^^^^^
+    [
+        [starting_line_number, block_comment],
+        [starting_line_number, block_comment],
+        ...
+    ]
+
+Where "block_comment" is a block comment as an array of lines:
+
+    block_comment = [line, line, line, line, ...]
+
+
+Line Comments
+^^^^^^^^^^^^^
+    [
+        [line_number, comment],
+        [line_number, comment],
+        ...
+    ]
+
+Comments are not copied out of the source. Each "line" of a block
+comment and each "comment" is an array of spans into the original
+source code:
+
+    line = [(start, end), (start, end), ...]
+
+
+Tree-formatted source code format:
+----------------------------------
+    nested_code =
+    [
+        [line_number, code, nested_code],
+        [line_number, code, nested_code],
+        ...
+    ]
+
+Tree snapshots:
+---------------
+    snapshot = [make_indented, macros, nested_code, block_comments, line_comments]
+
+Where "make_indented" tells the syntax of the source, "macros" is None
+or a frozenset of statement macro names, and the comments are in
+line-referenced data format. The spans of comments refer to the source,
+so a snapshot is only used together with the source it was parsed from.
+
+Snapshots are stored with marshal format version 4, following the
+TREE_MAGIC bytes:
+
+    [TREE_VERSION, key, snapshot]
+
+Where "key" is the content hash of the source and the parsing options.
+TREE_VERSION is increased whenever the layout of a snapshot changes.
+
+"""
+
+import sys
+import os
+import re
+
+# Modules that are only needed by some modes are imported where they are
+# used, which keeps the start-up time of a single conversion short.
+
+IND_AMT = 4
+
+# Filename extensions of curly braces syntax, and the matching filename
+# extensions of indented syntax.
+INDENTED_EXT = {
+    ".c": ".ic", ".h": ".ih",
+    ".cpp": ".icpp", ".hpp": ".ihpp",
+    ".cc": ".icc", ".hh": ".ihh",
+    ".cxx": ".icxx", ".hxx": ".ihxx",
+}
+CURLY_EXT = {v: k for k, v in INDENTED_EXT.items()}
+
+# The language that a C/C++ compiler is told with "-x" for each filename
+# extension of curly braces syntax.
+CC_LANGUAGES = {
+    ".c": "c", ".h": "c-header",
+    ".cpp": "c++", ".hpp": "c++-header",
+    ".cc": "c++", ".hh": "c++-header",
+    ".cxx": "c++", ".hxx": "c++-header",
+}
+
+# Compiler options that take the next argument as their value.
+CC_VALUE_OPTIONS = {
+    "-o", "-x", "-I", "-D", "-U", "-L", "-include", "-imacros", "-iquote",
+    "-isystem", "-idirafter", "-iprefix", "-MF", "-MT", "-MQ", "-T", "-u",
+    "-Xlinker", "-Xassembler", "-Xpreprocessor", "--param", "-aux-info",
+}
+
+# Archive filename extensions, and the tarfile write mode of each.
+TAR_MODES = {
+    ".tar": "w|", ".tar.gz": "w|gz", ".tgz": "w|gz",
+    ".tar.bz2": "w|bz2", ".tbz2": "w|bz2",
+    ".tar.xz": "w|xz", ".txz": "w|xz",
+}
+
+# Tree snapshots: the leading bytes of a file, the version of the format,
+# and the cache directory that is created next to sources.
+TREE_MAGIC = b"THINC-TREE\n"
+TREE_VERSION = 2
+TREE_DIR = ".thinc-tree"
+
+# cosmetic_lines() uses layout_numpy() for outputs of at least this many
+# lines, if NumPy is installed. Below it, importing NumPy takes longer
+# than it saves.
+NUMPY_MIN_LINES = 20000
+
+# Characters that str.splitlines() treats as line boundaries.
+LINE_BREAKS = "\r\n\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+
+def readFile(fn):
+    """Read file."""
+    with open(fn, 'r') as f:
+        lines = f.read()
+    return lines
+
+def writeFile(fn, data):
+    """Write file."""
+    with open(fn, 'w') as f:
+        f.write(data)
+
+
+def indent(code, N=0):
+    """Construct code having indentation syntax.
+
+    args:
+        code: Tree-formatted source code.
+
+    returns:
+        out_code: source code with indentation syntax"""
+
+    out_code = []
+    for nL in range(len(code)):
+        out_code.append([code[nL][0], " "*(N)*IND_AMT, code[nL][1]])
+        out_code += indent(code[nL][2], N+1)
+    return out_code
+
+
+def curlify(code, N=0):
+    """Construct code having curly braces syntax.
+
+    args:
+        code: Tree-formatted source code.
+
+    returns:
+        out_code: source code with curly braces syntax"""
+
+    out_code = []
+    for nL in range(len(code)):
+        if code[nL][2]:
+            out_code.append([code[nL][0], " "*N*IND_AMT, code[nL][1] + " {"])
+            out_code += curlify(code[nL][2], N+1)
+            out_code.append([None, " "*N*IND_AMT, "}", "", ""])
+        else:
+            out_code.append([code[nL][0], " "*N*IND_AMT, code[nL][1]])
+    return out_code
+
+
+def nest_indented(code):
+    """Convert intended code into nested tree structure.
+
+    args:
+        code: Line-referenced data that was produced from indentation-
+        style source code.
+
+    returns:
+        data: Tree-formatted source code
+    """
+
+    re_indent = re.compile('^([\s]*)(.*)')
+    line_cont = False
+    data = []
+    for nL in range(len(code)):
+        line_num = code[nL][0]
+        line = code[nL][1]
+
+        r = re_indent.search(line)
+        white_space = r.group(1)
+        char_space = r.group(2)
+
+        nI = len(white_space) // IND_AMT
+
+        # If line is being continued, use the indentation of the
+        # previous line. Account for any leading white space.
+        if line_cont:
+            leading_white_space = white_space[:-nIp*IND_AMT]
+            char_space =  leading_white_space + char_space
+            nI = nIp
+
+        data_r = data
+        for nT in range(nI*2):
+            data_r = data_r[-1]
+
+        if line_cont:
+            # add to existing line
+            data_r[-1][-2] = data_r[-1][-2][:-1] + char_space
+        else:
+            # append new line
+            data_r.append([line_num, char_space, []])
+
+        line_cont = char_space[-1] == "\\"
+        # white_space_prev = white_space
+        nIp = nI
+
+    return data
+
+
+def span_text(raw_code, spans):
+    """Join the text of a flat sequence of spans, (start, end, start,
+    end, ...), where each start and end is an offset into raw_code."""
+    return "".join([raw_code[spans[n]:spans[n+1]] for n in range(0, len(spans), 2)])
+
+
+def parse_raw_code(raw_code, comments=True):
+    """Separate code, block comments, and line comments.
+
+    args:
+        raw_code: The source code as a single string. Line comments
+            begin with "//" and block comments use the "/*" and "*/"
+            syntax.
+        comments: False to drop the comments, in which case bcoms and
+            coms are returned empty.
+
+    returns:
+        out_code2: Line-referenced data containing code.
+        bcoms: Line-referenced data containing block comments, where
+        the block comments that begin on the same line are "rolled up"
+        as one tuple of spans.
+        coms: Line-referenced data containing line comments.
+
+    Comments are not copied out of raw_code. They are flat tuples of
+    spans, (start, end, start, end, ...), of offsets into raw_code. The
+    span of a block comment runs over all of its lines, which are only
+    split by block_comments_expand(), and the text is only sliced out
+    when the output is joined, see code_join().
+    """
+
+    # Only these characters can change the state of the parser. All
+    # characters in between them belong to the same object.
+    re_special = re.compile('["/*]')
+
+    def _append(spans, start, end):
+        if start == end:
+            return
+        if spans and spans[-1] == start:
+            spans[-1] = end
+        else:
+            spans += (start, end)
+
+    def _truncate(spans, N):
+        while N and spans:
+            start, end = spans[-2:]
+            if end - start > N:
+                spans[-1] = end - N
+                N = 0
+            else:
+                N -= end - start
+                del spans[-2:]
+
+    isBlockComment = False
+    isQuotesOpen = False
+
+    out_code = []
+    bcoms = []
+    coms = []
+
+    offset = 0
+    for nL, line in enumerate(raw_code.splitlines(True)):
+        line_start = offset
+        offset += len(line)
+        line = line.rstrip(LINE_BREAKS)
+
+        if not line.strip():
+            continue
+
+        isComment = False
+
+        if not out_code or out_code[-1][1]:
+            out_code.append([nL, ""])
+        else:
+            out_code[-1][0] = nL
+
+        code_spans = []
+        nC0 = 0 # first character not yet assigned to an object
+        for r in re_special.finditer(line):
+            nC = r.start()
+            c = line[nC]
+            cm1 = line[nC-1] if nC else "\n" # previous character
+
+            if not isBlockComment:
+                _append(code_spans, nC0, nC + 1)
+            nC0 = nC + 1
+
+            isEscaped = cm1 == "\\"
+            if c == "\"" and not (isBlockComment or isEscaped):
+                isQuotesOpen = not isQuotesOpen
+            if cm1 == "/" and c == "/" and not (isQuotesOpen or isBlockComment):
+                # The rest of the line is a line comment.
+                isComment = True
+                _truncate(code_spans, 2)
+                if comments:
+                    coms.append([nL, (line_start + nC - 1, line_start + len(line))])
+                break
+            if cm1 == "/" and c == "*" and not (isQuotesOpen or isBlockComment):
+                isBlockComment = True
+                _truncate(code_spans, 2)
+                # The end of the span is moved along until the comment
+                # is closed.
+                span = [line_start + nC - 1, line_start + nC + 1]
+                if comments and (not bcoms or bcoms[-1][0] != nL):
+                    # new block comment
+                    bcoms.append([nL, span])
+                elif comments:
+                    # multiple block comments on same line
+                    bcoms[-1][-1] += span
+            elif cm1 == "*" and c == "/" and not isQuotesOpen:
+                if isBlockComment and comments:
+                    bcoms[-1][-1][-1] = line_start + nC + 1
+                isBlockComment = False
+
+        if not isComment:
+            if isBlockComment:
+                if comments:
+                    bcoms[-1][-1][-1] = line_start + len(line)
+            else:
+                _append(code_spans, nC0, len(line))
+
+        out_code[-1][-1] = span_text(line, code_spans)
+
+
+    # 1) Remove trailing tabs and white space from code
+    # 2) Replace leading tabs with IND_AMT white spaces.
+    out_code2 = []
+    for nL in range(len(out_code)):
+        line = out_code[nL][1]
+        code_line = line.strip(" \t")
+        if code_line:
+            white_space = line[:len(line) - len(line.lstrip(" \t"))]
+            out_code2.append([out_code[nL][0], white_space.replace("\t", " "*IND_AMT) + code_line])
+
+    bcoms = [[nL, tuple(spans)] for nL, spans in bcoms]
+
+    return out_code2, bcoms, coms
+
+
+def merge_comments(code, bcoms, coms, ch):
+    """Recombine new code with the original block comments and comments.
+
+    Each output line is [white_space, code, block_comment, line_comment,
+    line_reference], where line_reference is the key the line was merged
+    under. Keys that are whole numbers are line numbers of the original
+    source, fractional keys belong to lines that were created during
+    the conversion. Lines that were split off another line, e.g. the
+    condition of a do-while loop, are merged under a fractional key,
+    but keep the line number they were split off as line_reference."""
+
+    # Line number references will be used as dictionary keys.
+
+    # Iterate over "code". Replace duplicate keys and insert keys
+    # wherever they are absent. Be sure that key_{n} < key_{n+1} is
+    # always true. In other words, it is paramount that the order of
+    # the lines in "code" be preserved.
+    code_d = dict()
+    key = -1
+    for l in code:
+        last_key = key
+        key = l[0]
+        if key == None or key in code_d:
+            key = last_key + 1/1024
+        code_d[key] = [l[1], l[2], l[0]]
+
+
+    bcom_d = dict()
+    for l in bcoms:
+        try:
+            if ch[l[0]]:
+                bcom_d[ch[l[0]]] = l[1]
+            else:
+                bcom_d[l[0]] = l[1]
+        except KeyError:
+            bcom_d[l[0]] = l[1]
+
+    com_d = dict()
+    for l in coms:
+        try:
+            if ch[l[0]]:
+                com_d[ch[l[0]]] = l[1]
+            else:
+                com_d[l[0]] = l[1]
+        except KeyError:
+            com_d[l[0]] = l[1]
+
+
+    # Iterate over all key values and combine (white space, )code, block
+    # comments, and comments.
+    all_keys = sorted(set(code_d.keys()) | set(bcom_d.keys()) | set(com_d.keys()))
+    out_code = []
+    for N in all_keys:
+        s = ['', '', (), ()]
+
+        # add white space and code
+        ref = N
+        try:
+            s[0] = code_d[N][0]
+            s[1] = code_d[N][1]
+            if code_d[N][2] is not None:
+                ref = code_d[N][2]
+        except KeyError: pass
+
+        # add block comment
+        try:
+            s[2] = bcom_d[N]
+        except KeyError: pass
+
+        # add line comment
+        try:
+            s[3] = com_d[N]
+        except KeyError: pass
+
+        # if line not blank, append it along with its line reference
+        if s != ['', '', (), ()]:
+            s.append(ref)
+            out_code.append(s)
+
+    # Make indentation for line comments the same as the first line
+    # of code that comes after it. Note: This can mess up block comments
+    # as the white-space within them is already preserved.
+    spaces = ""
+    for N in reversed(range(len(out_code))):
+        if not out_code[N][1]:
+            out_code[N][0] = spaces
+        else:
+            spaces = out_code[N][0]
+
+    return out_code
+
+
+def nest_curly(code, macros=None):
+    """Convert curly-braces code into nested tree structure.
+
+    args:
+        code: Line-referenced data that was produced from curly braces-
+        style source code.
+        macros: An optional set of names of macros that expand to
+        statements or block delimiters, see MacroIndex. Lines that only
+        use one of these macros are nodes of their own.
+
+    returns:
+        data: Tree-formatted source code
+    """
+
+    def _update_data(num_line, nI, code_buf, data):
+        data_r = stack[nI] if nI > 0 else data
+        data_r.append([num_line, code_buf.strip(), []])
+        code_buf = ""
+        return code_buf
+
+    re_access_modifier_raw = re.compile('^( *)(public|private|protected)( *):$')
+    re_switch_raw = re.compile("^( *)(case( .*|'.'|)|default *):$")
+    re_macro_use = re.compile('^ *([a-zA-Z_][a-zA-Z0-9_]*)( *\\(.*\\)|) *$')
+
+    c = "" # This gets overwritten but it triggers better comment formatting
+    cm1 = c
+    nI = 0 # indentation amount
+    code_buf = ""
+    data = []
+    # The open blocks: stack[n] is the array of children of the last
+    # node at nesting level n-1, so that a node is appended without
+    # walking down the tree.
+    stack = [data]
+    isParenOpen = False
+    isQuotesOpen = False
+
+    for nL in range(len(code)):
+
+        num_line, codeLine = code[nL]
+
+        if not codeLine:
+            continue
+
+        isMacro = codeLine[0] == "#"
+
+        if isMacro:
+            if code_buf.strip() != "":
+                code_buf = _update_data(num_line-1, nI, code_buf, data)
+            code_buf = codeLine
+            code_buf = _update_data(num_line, nI, code_buf, data)
+            continue
+
+        if macros and not isQuotesOpen and not code_buf.strip():
+            r = re_macro_use.search(codeLine)
+            if r and r.group(1) in macros:
+                code_buf = _update_data(num_line, nI, codeLine, data)
+                continue
+
+        for nC in range(len(codeLine)):
+
+            # The line is being continued. Skip ahead to next line
+            if codeLine[nC] == "\\" and nC == len(codeLine)-1:
+                continue
+
+            cm1 = c
+            c = codeLine[nC]
+
+            # Was previous character escape character? Was it line
+            # continuation character?
+            isEscaped = (cm1 == "\\") and (nC != 0)
+
+            if c == "\"" and not isEscaped:
+                isQuotesOpen = not isQuotesOpen
+
+            # Things to do if quotes are NOT open.
+            if not isQuotesOpen:
+                # If a double space is found, go to the next character,
+                if c == ' ' and cm1 == ' ':
+                    continue
+                elif c == "(":
+                    isParenOpen = True
+                elif c == ")":
+                    isParenOpen = False
+                # If a curly brace is found, change the nesting level,
+                elif c in ["{", "}"]:
+                    # Either check here for aggregate array
+                    # initialization, or handle it in the semi-colon
+                    # section.
+                        # re.compile("[^{}]{(.*)} *(,.*|) *;$"
+
+                    # The nesting level is going to changed. If there is
+                    # any data, append it & clear the buffers.
+                    if c == "{":
+                        if nC == 0 and num_line:
+                            num_line = num_line - 1
+
+                    code_buf = _update_data(num_line, nI, code_buf, data)
+
+                    if c == "{":
+                        nI += 1
+                        if nI > 0:
+                            stack[nI:] = [stack[nI-1][-1][2]]
+                    else:
+                        nI -= 1
+                        del stack[max(nI, 0)+1:]
+
+                    continue
+
+
+            # Now, all characters can be appended
+            code_buf += c
+
+            # More things to do if quotes are NOT open.
+            # 1) A semi-colon has been found. If there is any data,
+            #    append it & clear the buffers.
+            # 2) A colon has been found. If it is associated with any of
+            #    the keywords "private", "public", "protected", "case",
+            #    or "default", append data and clear buffers.
+            append_data = False
+            if not isQuotesOpen:
+                # look for semi-colon not within a loop head
+                if (c == ";" and not isParenOpen):
+                    append_data = True
+
+                # look for colon, but NOT scope resolution operator
+                elif (c == ":" and (re_access_modifier_raw.search(code_buf) or re_switch_raw.search(code_buf))):
+                    # Only the next character of the same line is
+                    # looked at, so that every colon takes constant
+                    # time.
+                    cp1 = codeLine[nC+1] if nC + 1 < len(codeLine) else " "
+
+                    if not (cm1 == ":" or cp1 == ":"):
+                        append_data = True # colon is not part of operator
+
+            if append_data:
+                if nC == 0 and num_line:
+                    num_line = num_line - 1
+                code_buf = _update_data(num_line, nI, code_buf, data)
+
+    return data
+
+
+def block_comments_expand(code, raw_code):
+    """Expand multi-line block comments.
+
+    args:
+        code: An array of the form:
+
+            [white_space, code, block_comments, line_comments, line_ref]
+
+        raw_code: The source code, which comment spans refer to.
+
+    returns:
+        out_code: The same as the input, except block comments are
+        unrolled:
+
+            [
+                [white_space, code, block_comment_line, line_comments, line_ref],
+                ["",          "",   block_comment_line, "",            line_ref + 1],
+                ["",          "",   block_comment_line, "",            line_ref + 2],
+                ...
+            ]
+
+    The spans of block comments are split at line breaks, and lines of
+    white space are dropped, the same as blank lines of code.
+    """
+
+    re_line_break = re.compile("\r\n|[" + LINE_BREAKS + "]")
+    re_text = re.compile("\\S")
+
+    def _lines(spans):
+        lines = [[]]
+        for n in range(0, len(spans), 2):
+            start, end = spans[n], spans[n+1]
+            for r in re_line_break.finditer(raw_code, start, end):
+                if start < r.start():
+                    lines[-1] += (start, r.start())
+                lines.append([])
+                start = r.end()
+            if start < end:
+                lines[-1] += (start, end)
+        return [tuple(line) for line in lines if line and re_text.search(raw_code, line[0], line[-1])]
+
+    out_code = []
+    for nL in range(len(code)):
+        ref = code[nL][4]
+        out_code.append([code[nL][0], code[nL][1], (), code[nL][3], ref])
+        if code[nL][2]:
+            lines = _lines(code[nL][2])
+            out_code[-1][2] = lines[0]
+            for nBC in range(1, len(lines)):
+                out_code.append([code[nL][0], "", lines[nBC], (), ref + nBC])
+    return out_code
+
+
+
+def add_colon(code):
+    """Adds colons to functions, classes, structs, typdefs, and enums.
+
+    args:
+        code: Tree-formatted source code.
+
+    returns:
+        out_code: Tree-formatted source code.
+    """
+
+    re_access_modifier = re.compile('^(public|private|protected)( *):$')
+    re_switch = re.compile("^(case( .*|'.'|)|default *):$")
+
+    out_code = []
+    for nL in range(len(code)):
+        branch = code[nL][:]
+        if branch[2]:
+            if branch[1]:
+                if not (re_access_modifier.search(branch[1]) or re_switch.search(branch[1])):
+                    branch[1] += ":"
+            else:
+                branch[0] = None
+                branch[1] += ":"
+        branch = [*branch[:2], add_colon(branch[2])]
+        out_code.append(branch)
+    return out_code
+
+
+
+def rem_special_indent(code):
+    """Removes indention for special for blocks marked by "public",
+    "private", "protected", "case ", "default",
+
+    args:
+        code: Tree-formatted source code.
+
+    returns:
+        out_code: Tree-formatted source code."""
+
+
+    re_access_modifier = re.compile("^(public|private|protected)( *):$")
+    re_switch = re.compile("^(case( .*|'.'|)|default *):$")
+
+    def _pattern_match(s):
+        isMatch = False
+        if re_access_modifier.search(s) or re_switch.search(s):
+            isMatch = True
+        return isMatch
+
+    out_code = []
+    for nL in range(len(code)):
+        if code[nL][2] and _pattern_match(code[nL][1]):
+            out_code.append([*code[nL][:2], []])
+            out_code += rem_special_indent(code[nL][2])
+        else:
+            out_code.append([*code[nL][:2], rem_special_indent(code[nL][2])])
+    return out_code
+
+
+def add_special_indent(code):
+    """Adds indention for special for blocks marked by "public",
+    "private", "protected", "case ", "default",
+
+    args:
+        code: Tree-formatted source code.
+
+    returns:
+        out_code: Tree-formatted source code."""
+
+
+    re_access_modifier = re.compile("^(public|private|protected)( *):$")
+    re_switch = re.compile("^(case( .*|'.'|)|default *):$")
+
+    def _pattern_match(s):
+        isMatch = False
+        if re_access_modifier.search(s) or re_switch.search(s):
+            isMatch = True
+        return isMatch
+
+    isIndented = False
+    out_code = []
+    for nL in range(len(code)):
+        isKeyWord = _pattern_match(code[nL][1])
+        if isKeyWord:
+            out_code.append([*code[nL][:2], add_special_indent(code[nL][2])])
+            isIndented = True
+        elif isIndented:
+            out_code[-1][-1].append([*code[nL][:2], add_special_indent(code[nL][2])])
+        else:
+            out_code.append([*code[nL][:2], add_special_indent(code[nL][2])])
+
+    return out_code
+
+
+def add_semicolon(code, macros=None):
+    """Adds semi-colons to the end of code lines, classes, structs,
+    typedefs, enums, and function declarations.
+
+    args:
+        code: Tree-formatted source code.
+        macros: An optional set of names of macros that expand to
+            statements or block delimiters, see MacroIndex. Lines that
+            only use one of these macros do not get a semi-colon.
+
+    returns:
+        out_code: Tree-formatted source code.
+    """
+    def _is_aggregate_array(v):
+        b = False
+
+        if v[2]:
+            pass
+        elif v[1]:
+            is_d_quote_open = False
+            is_s_quote_open = False
+            c = ""
+            for n in range(len(v[1])):
+                cm1 = c
+                c = v[1][n]
+                is_escaped = cm1 == "\\"
+        return b
+
+    re_array_init = re.compile('^([a-zA-Z0-9_] *)$')
+    re_array_init = re.compile('^([a-zA-Z0-9_] *)$')
+    re_macro = re.compile('^#.*$')
+    re_enum = re.compile('^enum( .*|,.*|)$') # enum do not end with a ";"
+    re_macro_use = re.compile('^([a-zA-Z_][a-zA-Z0-9_]*)( *\\(.*\\)|)$')
+
+    out_code = []
+    for nL in range(len(code)):
+        branch = code[nL][:]
+        if branch[2]:
+            if not re_enum.search(branch[1]):
+                branch = [*branch[:2], add_semicolon(branch[2], macros)]
+        elif branch[1]:
+            if not re_macro.search(branch[1]):
+                r = macros and re_macro_use.search(branch[1])
+                if not (r and r.group(1) in macros):
+                    branch[1] += ";"
+
+        out_code.append(branch)
+    return out_code
+
+
+def rem_colon(code):
+    """Removes colons from functions, classes, structs, typdefs, and enums.
+
+    args:
+        code: Tree-formatted source code.
+
+    returns:
+        out_code: Tree-formatted source code.
+    """
+
+    re_access_modifier = re.compile('^(public|private|protected)( *):$')
+    re_switch = re.compile("^(case( .*|'.'|)|default *):$")
+
+    out_code = []
+    for nL in range(len(code)):
+        branch = code[nL][:]
+        # if branch[1] and branch[2]:
+        if branch[1]:
+            if not (re_access_modifier.search(branch[1]) or re_switch.search(branch[1]) or branch[1][0] == "#"):
+                if branch[1][-1] == ":":
+                    branch[1] = branch[1][:-1]
+                    # Add empty code line if there is no code in between braces
+                    if not branch[2]:
+                        branch[2] = [[None, "", []]]
+        branch = [*branch[:2], rem_colon(branch[2])]
+        out_code.append(branch)
+    return out_code
+
+
+def rem_semicolon(code):
+    """Removes semi-colons from the ends of code lines, classes, structs,
+    typedefs, enums, and function declarations.
+
+    args:
+        code: Tree-formatted source code.
+
+    returns:
+        out_code: Tree-formatted source code.
+    """
+
+
+    out_code = []
+    for nL in range(len(code)):
+        branch = code[nL][:]
+        if branch[1]:
+            if branch[1][-1] == ";" and not branch[2]:
+                branch[1] = branch[1][:-1]
+        branch = [*branch[:2], rem_semicolon(branch[2])]
+        out_code.append(branch)
+    return out_code
+
+
+
+def to_indented_aliases(code):
+    """Restructure code for classes, structs, typdefs, and enums.
+
+    args:
+        code: Tree-formatted source code.
+
+    returns:
+        out_code: Tree-formatted source code.
+        mv: A dictionary of line numbers that have been combines. Format
+        is { original_line_number: new_line_number, ... }
+    """
+
+    re_class_curly = re.compile('^(class|struct|typedef|enum|union)( [^;]*|)$')
+
+    def _f(_branch0, _branch1):
+        """Analyze node for aliases. If found,restructure alias."""
+        if re_class_curly.search(_branch0[1]):
+            child_parrents = _branch0[1].split(":")
+            if len(child_parrents) == 2:
+                parrents = ": " + child_parrents[1].strip()
+            else:
+                parrents = ""
+            child = child_parrents[0]
+            if _branch1[1][:-1]:
+                aliases = ", " + _branch1[1][:-1]
+            else:
+                aliases = ""
+
+            _new_code = [_branch0[0], child + aliases + parrents, _branch0[2]]
+            _skipNext = True
+        else:
+            _new_code = _branch0
+            _skipNext = False
+        return [_new_code, _skipNext]
+
+
+    out_code = []
+    skipNext = False
+    mv = dict()
+    for nL in range(len(code)):
+        if skipNext:
+            skipNext = False
+        else:
+            try:
+                new_code, skipNext = _f(code[nL][:], code[nL+1][:])
+                if skipNext:
+                    mv[code[nL+1][0]] = code[nL][0]
+            except IndexError:
+                new_code = code[nL][:]
+            nested_code, nested_mv = to_indented_aliases(new_code[2])
+            out_code.append([*new_code[:2], nested_code])
+            mv.update(nested_mv)
+
+    return out_code, mv
+
+
+def to_indented_do_while(code):
+    """Restructure code for do-while loops.
+
+    args:
+        code: Tree-formatted source code.
+
+    returns:
+        out_code: Tree-formatted source code.
+        mv: A dictionary of line numbers that have been combines. Format
+        is { original_line_number: new_line_number, ... }
+    """
+
+    def _f(_branch0, _branch1):
+        """Analyze node for aliases. If found, restructure alias."""
+        if _branch0[1] == "do" and _branch1[1][-1:] == ";" and isWhileCondition(_branch1[1][:-1]):
+            _new_code = [_branch0[0], _branch0[1] + " " + _branch1[1][:-1], _branch0[2]]
+            _skipNext = True
+        else:
+            _new_code = _branch0
+            _skipNext = False
+        return [_new_code, _skipNext]
+
+    out_code = []
+    skipNext = False
+    mv = dict()
+    for nL in range(len(code)):
+        if skipNext:
+            skipNext = False
+        else:
+            try:
+                new_code, skipNext = _f(code[nL][:], code[nL+1][:])
+                if skipNext:
+                    mv[code[nL+1][0]] = code[nL][0]
+            except IndexError:
+                new_code = code[nL][:]
+            nested_code, nested_mv = to_indented_do_while(new_code[2])
+            out_code.append([*new_code[:2], nested_code])
+            mv.update(nested_mv)
+
+    return out_code, mv
+
+
+
+def to_curly_aliases(code):
+    """Restructure code for classes, structs, enums, and typdefs.
+
+    args:
+        code: Tree-formatted source code.
+
+    returns:
+        out_code: Tree-formatted source code
+        mv: A dictionary of line numbers that have been split. Format
+        is { original_line_number: None, ... }
+    """
+
+    re_class_indented = re.compile('^(class|struct|typedef|enum|union)( [^;]*|,[^;]*|)$')
+
+    def _f(_branch0):
+        """Analyze node for aliases. If found,restructure alias."""
+        child_parrents, inner_code, aliases = [_branch0[1], _branch0[2], ""]
+
+        # if regex is true, change above values
+        if re_class_indented.search(_branch0[1]):
+            child_aliases_parrents = _branch0[1].split(":")
+            child_aliases = child_aliases_parrents[0].split(", ")
+
+            child_parrents = child_aliases[0]
+            if len(child_aliases_parrents) == 2:
+                child_parrents += (": " + child_aliases_parrents[1].strip())
+
+            aliases = ";"
+            if len(child_aliases) >= 2:
+                aliases = ", ".join(map(str.strip, child_aliases[1:])) + ";"
+
+        return [child_parrents, inner_code, aliases]
+
+    mv = dict()
+    out_code = []
+    for nL in range(len(code)):
+        res = _f(code[nL][:])
+        nested_code, ch = to_curly_aliases(res[1])
+        out_code.append([code[nL][0], res[0], nested_code])
+        mv.update(ch)
+        if res[2]: # A benign "if" statement to cut down on some of the noise.
+            # out_code.append([None, res[2], []])
+            mv[code[nL][0]] = None
+            out_code.append([code[nL][0], res[2], []])
+
+    return out_code, mv
+
+
+def to_curly_do_while(code):
+    """Restructure code for do-while loops.
+
+    args:
+        code: Tree-formatted source code.
+
+    returns:
+        out_code: Tree-formatted source code
+        mv: A dictionary of line numbers that have been split. Format
+        is { original_line_number: None, ... }
+    """
+
+    def _f(_branch0):
+        """Analyze node for aliases. If found,restructure alias."""
+        top, inner_code, bottom = [_branch0[1], _branch0[2], ""]
+        # if this is a do-while loop, change above values
+        if _branch0[1][:3] == "do " and isWhileCondition(_branch0[1][3:]):
+            top = "do"
+            bottom = _branch0[1][3:] + ";"
+        return [top, inner_code, bottom]
+
+    mv = dict()
+    out_code = []
+    for nL in range(len(code)):
+        res = _f(code[nL][:])
+        nested_code, ch = to_curly_do_while(res[1])
+        out_code.append([code[nL][0], res[0], nested_code])
+        mv.update(ch)
+        if res[2]: # A benign "if" statement to cut down on some of the noise.
+            mv[code[nL][0]] = None
+            out_code.append([code[nL][0], res[2], []])
+
+    return out_code, mv
+
+
+
+def isWhileCondition(s):
+    """Determine if a line is the condition of a loop, i.e. "while",
+    optional spaces, and a parenthesized expression."""
+    rest = s[5:].lstrip(" ")
+    return s[:5] == "while" and rest[:1] == "(" and rest[-1:] == ")" and len(rest) > 2
+
+
+def cosmetic_lines(code0):
+    """Add or remove new lines to certain places in the source code.
+    This operation is purely cosmetic.
+
+    args:
+        code0: source code as an array of lines.
+
+    return:
+        out_code: source code as an array of lines."""
+
+    # strip any extra spaces from input
+    code1 = [line for line in code0 if line[0].strip() or line[1].strip() or line[2] or line[3]]
+
+
+    re_alias_name = re.compile("[a-zA-Z_][a-zA-Z0-9_]* *")
+    re_alias_list = re.compile("[a-zA-Z0-9_ ,]+")
+
+    def _isAlias(_s):
+        """Determine if a line starts with a semi-colon, or with a name
+        or list of names that is ended by a semi-colon. The line is
+        split at its first semi-colon and comma, and each part is
+        matched on its own, which takes linear time."""
+        _names = _s.partition(";")
+        if not _names[1]:
+            return False
+        _first, _comma, _rest = _names[0].partition(",")
+        if not (_first or _comma):
+            return True
+        return bool(re_alias_name.fullmatch(_first)) and (not _comma or bool(re_alias_list.fullmatch(_rest)))
+
+    # drag aliases back behind closing curly bracket
+    code = []
+    prev_char = ""
+    for line in code1:
+        if prev_char == "}" and _isAlias(line[1]):
+            code[-1][1] += " "*(len(line[1]) > 1) + line[1]
+            code[-1][2] += line[2]
+            code[-1][3] += line[3]
+        else:
+            code.append(line)
+        prev_char = line[1][-1:] or " "
+
+
+    insert_line = None
+    if len(code) >= NUMPY_MIN_LINES:
+        insert_line = layout_numpy(code)
+    if insert_line is None:
+        insert_line = layout_python(code)
+
+    # insert new lines
+    out_code = []
+    for line, isBlank in zip(code, insert_line):
+        out_code.append(line)
+        if isBlank:
+            out_code.append(["","",(),(),None])
+
+
+    return out_code
+
+
+def layout_python(code):
+    """Determine after which lines cosmetic_lines() inserts a blank
+    line.
+
+    args:
+        code: source code as an array of lines.
+
+    returns:
+        insert_line: An array of booleans, one for each line."""
+
+    insert_line = [False]*len(code)
+
+    # Create annotation for all lines.
+    label = [None] * len(code)
+    depth = [None] * len(code)
+
+    for n in range(len(code)):
+        depth[n] = len(code[n][0])
+        if code[n][1]:
+            if code[n][1][0] == "#":
+                label[n] = "macro"
+            elif code[n][1][0] == "}":
+                label[n] = "close_brace"
+            else:
+                label[n] = "code"
+        elif code[n][2] or code[n][3]:
+            label[n] = "comment"
+
+    # Iterate over code while looking two line ahead.
+    for n in range(len(code)):
+        i0 = depth[n]
+        l0 = label[n]
+        try:
+            i1 = depth[n+1]
+            l1 = label[n+1]
+        except IndexError:
+            l1 = None
+            i1 = None
+        try:
+            i2 = depth[n+2]
+            l2 = label[n+2]
+        except IndexError:
+            l2 = None
+            i2 = None
+
+        # Only add spaces when the next item is not indented.
+        if i1 == 0:
+            # Add space for certain changes in content type.
+            if     (l0 == "code" and l1 == "comment") \
+                or (l0 == "close_brace" and l1 == "comment") \
+                or (l0 == "close_brace" and l1 == "code") \
+                or (l0 == "macro" and l1 == "comment") \
+                or (l0 == "macro" and l1 == "code") \
+                or (l0 == "comment" and l1 == "macro") \
+                or (l0 == "comment" and l1 == "code") \
+                or (l0 == "code" and l1 == "macro"):
+                    insert_line[n] = True
+            # Examine consecutive code blocks
+            elif (l0 == "code" or l0 == "close_brace") and l1 == "code":
+                # Add space if indention will decrease.
+                if i0 > i1:
+                    insert_line[n] = True
+                # Add space if next code section is a block of code. For
+                # example a function, class, loop, or ect.
+                elif i2 != None and i2 > i1:
+                    insert_line[n] = True
+
+        # Add blank at very end. C/C++ compilers often like this.
+        if i1 == None and i2 == None:
+            insert_line[n] = True
+
+    return insert_line
+
+
+def layout_numpy(code):
+    """The same as layout_python(), computed with NumPy. Labels and
+    depths are integer arrays, and every rule compares each line with
+    the next lines by shifted slices of these arrays.
+
+    returns:
+        insert_line: An array of booleans, or None if NumPy is not
+            installed."""
+
+    try:
+        import numpy
+    except ImportError:
+        return None
+
+    # Labels: 0 for blank lines, then code, close_brace, macro, comment.
+    CODE, CLOSE_BRACE, MACRO, COMMENT = 1, 2, 3, 4
+    N = len(code)
+    label = numpy.array([(COMMENT if line[2] or line[3] else 0) if not line[1]
+        else MACRO if line[1][0] == "#" else CLOSE_BRACE if line[1][0] == "}" else CODE
+        for line in code], dtype=numpy.int8)
+    depth = numpy.fromiter([len(line[0]) for line in code], dtype=numpy.int64, count=N)
+
+    # Changes in content type that get a blank line.
+    pairs = numpy.zeros((5, 5), dtype=bool)
+    for l0, l1 in ((CODE, COMMENT), (CLOSE_BRACE, COMMENT), (CLOSE_BRACE, CODE),
+            (MACRO, COMMENT), (MACRO, CODE), (COMMENT, MACRO), (COMMENT, CODE), (CODE, MACRO)):
+        pairs[l0, l1] = True
+
+    insert_line = numpy.ones(N, dtype=bool)
+    if N > 1:
+        l0, l1 = label[:-1], label[1:]
+        i0, i1 = depth[:-1], depth[1:]
+        # The next line starts a block, e.g. a function or a loop.
+        i2_greater = numpy.zeros(N - 1, dtype=bool)
+        i2_greater[:-1] = depth[2:] > depth[1:-1]
+        isBlocks = ((l0 == CODE) | (l0 == CLOSE_BRACE)) & (l1 == CODE) & ((i0 > i1) | i2_greater)
+        # The last line is always followed by a blank line.
+        insert_line[:-1] = (i1 == 0) & (pairs[l0, l1] | isBlocks)
+    return insert_line.tolist()
+
+
+def isCurly(code):
+    """Determine if code is the standard C/C++ syntax. C/C++
+    syntax MUST have semi-colons at the end of lines. Indented syntax
+    should not, although it likely has colons at the end of lines.
+
+    args:
+        code: Code in line-referenced format.
+
+    returns:
+        isC: True, if code is C/C++ syntax, or False if code is indented
+        syntax. This option can be forced if code is misidentified."""
+
+    # An upper limit on the number of lines to analyze.
+    max_lines = min(50000, len(code))
+    count_semicolons = 0
+    count_colons = 0
+    count_code_lines = 0
+    isC = False
+    for nL in range(max_lines):
+        code_line = code[nL][1]
+        if code_line:
+            count_code_lines += 1
+            if code_line[-1] == ";":
+                count_semicolons += 1
+            elif code_line[-1] == ":":
+                count_colons += 1
+    if count_semicolons > count_colons:
+        isC = True
+    return isC
+
+
+def detect_syntax(raw_code, fn=None, threshold=0.9, min_votes=32, max_lines=50000):
+    """Determine if source code is C/C++ syntax from its raw text, before
+    it is parsed. Lines ending with a semi-colon, and lines of a lone
+    curly brace, count as votes for C/C++ syntax, and lines ending with
+    a colon count as votes for indented syntax. Other lines that end
+    with a curly brace do not vote, as the brace may close an
+    initializer, e.g. "int a[] = {1, 2}" in both syntaxes. Neither do
+    lines of a single name and a colon, which may be goto labels, except
+    for "else", "do", and "try". Case labels and access modifiers end with
+    a colon in both syntaxes, so they do not vote. A known filename
+    extension counts as a few votes.
+
+    The scan stops early, as soon as min_votes lines have voted and the
+    share of the majority has reached the threshold.
+
+    args:
+        raw_code: The source code as a single string.
+        fn: An optional filename, whose extension is used as a hint.
+        threshold: The share of votes required for a decision.
+        min_votes: The number of votes required to stop early.
+        max_lines: An upper limit on the number of lines to analyze.
+
+    returns:
+        isC: True, if code is C/C++ syntax, False if code is indented
+            syntax, or None if the syntax is ambiguous or mixed.
+        confidence: The share of votes of the majority, or 0.0 if there
+            were no votes at all.
+    """
+
+    re_label = re.compile("^(case( .*|'.'|)|default|public|private|protected|[a-zA-Z_][a-zA-Z0-9_]*) *$")
+    block_headers = ("else", "do", "try")
+
+    # A filename extension counts as this many votes.
+    ext_votes = 8
+
+    votes_c = 0
+    votes_i = 0
+    if fn:
+        ext = "." + fn.rpartition(".")[2]
+        if ext in INDENTED_EXT:
+            votes_c += ext_votes
+        elif ext in CURLY_EXT:
+            votes_i += ext_votes
+    votes_prior = votes_c + votes_i
+
+    isBlockComment = False
+    start = 0
+    end = 0
+    nL = 0
+    while end < len(raw_code) and nL < max_lines:
+        end = raw_code.find("\n", start)
+        if end < 0:
+            end = len(raw_code)
+        line = raw_code[start:end].strip()
+        start = end + 1
+        nL += 1
+
+        # Roughly remove comments. A few misread lines are harmless.
+        if isBlockComment:
+            if "*/" not in line:
+                continue
+            isBlockComment = False
+            line = line[line.index("*/")+2:].strip()
+        if "/*" in line:
+            nC = line.index("/*")
+            isBlockComment = "*/" not in line[nC+2:]
+            line = line[:nC].rstrip()
+        if "//" in line and "\"" not in line:
+            line = line[:line.index("//")].rstrip()
+        if not line or line[0] == "#":
+            continue
+
+        if line[-1] == ";" or line in ("{", "}"):
+            votes_c += 1
+        elif line[-1] == ":" and (line[:-1].rstrip() in block_headers or not re_label.search(line[:-1])):
+            votes_i += 1
+        else:
+            continue
+
+        if votes_c + votes_i - votes_prior >= min_votes \
+                and max(votes_c, votes_i) >= threshold * (votes_c + votes_i):
+            break
+
+    if not votes_c + votes_i:
+        return None, 0.0
+    confidence = max(votes_c, votes_i) / (votes_c + votes_i)
+    if confidence < threshold:
+        return None, confidence
+    return votes_c > votes_i, confidence
+
+
+def code_join(code, raw_code):
+    """Join lines into a single string. Comments are sliced out of
+    raw_code, the source code they were parsed from."""
+    middle_code2 = [None]*len(code)
+    for n in range(len(code)):
+        middle_code2[n] =    code[n][0] \
+                + code[n][1] \
+                + " "*bool(code[n][1])*(bool(code[n][2]) or bool(code[n][3])) \
+                + span_text(raw_code, code[n][2]) \
+                + " "*bool(code[n][2])*bool(code[n][3]) \
+                + span_text(raw_code, code[n][3])
+    return '\n'.join(middle_code2)
+
+
+def add_line_directives(code, fn, raw_code):
+    """Insert "#line" directives so that a C/C++ compiler reports the
+    line numbers of the original source. A directive is only inserted
+    where the generated lines stop following the original lines, e.g.
+    after closing curly braces or lines that were added for cosmetic
+    reasons.
+
+    args:
+        code: source code as an array of lines, as returned by
+            cosmetic_lines().
+        fn: The name of the original source file.
+        raw_code: The original source code.
+
+    returns:
+        out_code: source code as an array of lines."""
+
+    fn = fn.replace("\\", "\\\\").replace("\"", "\\\"")
+    out_code = []
+    expected = None # The line number the compiler assigns to the next line
+    isContinued = False
+    for n in range(len(code)):
+        ref = code[n][4]
+        # Directives can only be placed in front of code, and never
+        # within a macro that is continued on the next line.
+        if code[n][1] and ref is not None and ref == int(ref) and not isContinued:
+            line_num = int(ref) + 1
+            if line_num != expected:
+                out_code.append(["", '#line %d "%s"' % (line_num, fn), (), (), None])
+                expected = line_num
+        out_code.append(code[n])
+        if expected is not None:
+            expected += 1
+        if code[n][3]:
+            isContinued = raw_code[code[n][3][-1]-1] == "\\"
+        else:
+            isContinued = code[n][1][-1:] == "\\"
+    return out_code
+
+
+def source_map(code):
+    """Construct a compact source map of converted code.
+
+    args:
+        code: source code as an array of lines, as returned by
+            cosmetic_lines() or add_line_directives().
+
+    returns:
+        smap: An array of runs, where each run is a block of consecutive
+        output lines that correspond to consecutive lines of the original
+        source. Lines are numbered from 1.
+
+            [
+                [output_line, source_line, number_of_lines],
+                [output_line, source_line, number_of_lines],
+                ...
+            ]
+    """
+
+    smap = []
+    for n in range(len(code)):
+        ref = code[n][4]
+        if ref is None:
+            continue
+        out_line = n + 1
+        src_line = int(ref) + 1
+        if smap and smap[-1][0] + smap[-1][2] == out_line and smap[-1][1] + smap[-1][2] == src_line:
+            smap[-1][2] += 1
+        else:
+            smap.append([out_line, src_line, 1])
+    return smap
+
+
+def source_map_dumps(smap, fn_in="", fn_out=""):
+    """Serialize a source map into its file format. The first three
+    lines are a header, a source filename, and an output filename. Each
+    following line is one run: "output_line source_line number_of_lines"."""
+
+    lines = ["thinc-source-map 1", "source " + fn_in, "output " + fn_out]
+    for run in smap:
+        lines.append("%d %d %d" % tuple(run))
+    return "\n".join(lines) + "\n"
+
+
+def source_map_loads(data):
+    """Parse a source map file.
+
+    returns:
+        smap: An array of runs, see source_map().
+        fn_in: The source filename.
+        fn_out: The output filename."""
+
+    lines = data.splitlines()
+    if not lines or lines[0] != "thinc-source-map 1":
+        raise ValueError("Not a thinc source map")
+    fn_in = lines[1][len("source "):]
+    fn_out = lines[2][len("output "):]
+    smap = [list(map(int, l.split())) for l in lines[3:] if l]
+    return smap, fn_in, fn_out
+
+
+def source_map_lookup(smap, line_num, reverse=False):
+    """Map a line number of the output back to the original source, or
+    with reverse=True, a line number of the original source to the
+    output. Returns None when the line has no counterpart."""
+
+    if reverse:
+        key, val = 1, 0
+    else:
+        key, val = 0, 1
+    for run in smap:
+        if run[key] <= line_num < run[key] + run[2]:
+            return run[val] + line_num - run[key]
+    return None
+
+
+class LRUCache:
+    """A least recently used cache that counts its hits and misses.
+
+    args:
+        maxsize: The maximum number of entries to keep.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = dict()
+
+    def get(self, key):
+        """Return the cached value for key, or None if it is absent."""
+        try:
+            value = self._data.pop(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self._data[key] = value
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Add a value, evicting the least recently used entry if the
+        cache is full."""
+        self._data.pop(key, None)
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            del self._data[next(iter(self._data))]
+
+    def hit_rate(self):
+        """The fraction of lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        """A one line summary of the cache statistics."""
+        return "%d hits, %d misses, %.1f%% hit rate, %d entries" % (
+            self.hits, self.misses, 100*self.hit_rate(), len(self._data))
+
+
+class MacroIndex:
+    """An index of preprocessor macros that expand to statements or
+    block delimiters, i.e. whose definitions end with a semi-colon, a
+    curly brace, or a colon. A line that only uses such a macro must not
+    get a semi-colon when it is converted into curly braces syntax, and
+    it must not be joined with the next statement when it is converted
+    into indented syntax.
+
+    Headers are found through "#include" directives. Each header is
+    scanned once: the results are cached by the hash of its content,
+    and the hash is cached by the file's path, size, and modification
+    time.
+
+    args:
+        include_path: Directories that are searched for included
+            headers, after the directory of the including file.
+    """
+
+    def __init__(self, include_path=()):
+        self.include_path = list(include_path)
+        self.scans = 0
+        self._by_hash = dict()
+        self._by_path = dict()
+
+    def scan(self, raw_code):
+        """Scan source code for macro definitions and includes.
+
+        returns:
+            names: A frozenset of the names of the macros that expand to
+                statements or block delimiters.
+            local_includes: Headers included with quotes.
+            system_includes: Headers included with angle brackets.
+        """
+
+        import hashlib
+
+        key = hashlib.sha1(raw_code.encode("utf-8", "surrogateescape")).digest()
+        try:
+            return self._by_hash[key]
+        except KeyError:
+            pass
+        self.scans += 1
+
+        re_define = re.compile('^[ \t]*#[ \t]*define[ \t]+([a-zA-Z_][a-zA-Z0-9_]*)(\\([^)]*\\))?(.*)$')
+        re_include = re.compile('^[ \t]*#[ \t]*include[ \t]*("([^"]+)"|<([^>]+)>)')
+
+        names = set()
+        local_includes = []
+        system_includes = []
+        lines = raw_code.splitlines()
+        nL = 0
+        while nL < len(lines):
+            line = lines[nL]
+            nL += 1
+            if "#" not in line:
+                continue
+            # join continued lines
+            while line.endswith("\\") and nL < len(lines):
+                line = line[:-1] + lines[nL]
+                nL += 1
+
+            r = re_define.search(line)
+            if r:
+                body = re.sub('/\\*.*?\\*/', ' ', r.group(3))
+                body = body.split("//")[0].strip()
+                if body[-1:] in (";", "{", "}", ":"):
+                    names.add(r.group(1))
+                continue
+
+            r = re_include.search(line)
+            if r:
+                if r.group(2):
+                    local_includes.append(r.group(2))
+                else:
+                    system_includes.append(r.group(3))
+
+        res = (frozenset(names), tuple(local_includes), tuple(system_includes))
+        self._by_hash[key] = res
+        return res
+
+    def scan_file(self, fn):
+        """Scan a file, see scan(). Returns None if it can not be read."""
+
+        try:
+            st = os.stat(fn)
+            stamp = (st.st_size, st.st_mtime_ns)
+            if self._by_path.get(fn, (None,))[0] == stamp:
+                return self._by_path[fn][1]
+            with open(fn, 'r', errors="surrogateescape") as f:
+                res = self.scan(f.read())
+        except OSError:
+            return None
+        self._by_path[fn] = (stamp, res)
+        return res
+
+    def find_header(self, name, fn=None, isLocal=True):
+        """Find an included header, see header_names(). Local headers
+        are first searched for relative to the including file fn.
+        Returns None if the header is not found."""
+
+        dirs = self.include_path
+        if isLocal:
+            dirs = [os.path.dirname(fn) if fn else "."] + dirs
+        for d in dirs:
+            for n in header_names(name):
+                path = os.path.normpath(os.path.join(d, n))
+                if os.path.isfile(path):
+                    return path
+        return None
+
+    def names(self, raw_code, fn=None):
+        """Determine the names of all statement macros that are visible
+        in source code, including those of all headers that it includes
+        directly or indirectly.
+
+        args:
+            raw_code: The source code as a single string.
+            fn: The filename of the source code, to resolve includes.
+
+        returns:
+            names: A frozenset of macro names.
+        """
+
+        names = set()
+        visited = set()
+        todo = [(fn, self.scan(raw_code))]
+        while todo:
+            fn_h, res = todo.pop()
+            names.update(res[0])
+            includes = [(h, True) for h in res[1]] + [(h, False) for h in res[2]]
+            for name, isLocal in includes:
+                path = self.find_header(name, fn_h, isLocal)
+                if path and path not in visited:
+                    visited.add(path)
+                    res_h = self.scan_file(path)
+                    if res_h:
+                        todo.append((path, res_h))
+        return frozenset(names)
+
+
+def transform(code, make_indented, macros=None):
+    """Perform all transformations of tree-formatted code, and construct
+    code having either indentation syntax or curly braces syntax.
+
+    args:
+        code: Tree-formatted source code.
+        make_indented: True for indentation syntax, False for curly
+            braces syntax.
+        macros: An optional set of macro names, see add_semicolon().
+
+    returns:
+        out_code: Source code with the new syntax.
+        mv1: Line numbers moved by the alias transformations.
+        mv2: Line numbers moved by the do-while transformations.
+    """
+
+    if make_indented:
+        c3, mv1 = to_indented_aliases(code)
+        c4, mv2 = to_indented_do_while(c3)
+        c5 = add_special_indent(c4)
+        c6 = rem_semicolon(c5)
+        c7 = add_colon(c6)
+        out_code = indent(c7)
+    else:
+        c3 = rem_colon(code)
+        c4 = add_semicolon(c3, macros)
+        c5 = rem_special_indent(c4)
+        c6, mv2 = to_curly_do_while(c5)
+        c7, mv1 = to_curly_aliases(c6)
+        out_code = curlify(c7)
+    return out_code, mv1, mv2
+
+
+def split_units(code, make_indented):
+    """Split tree-formatted code into top-level units, which transform()
+    converts independently of each other.
+
+    Converting to curly braces syntax, every top-level node is a unit.
+    Converting to indented syntax, a class-like declaration or a "do"
+    is joined with the node that follows it, as this is where aliases
+    and while loops are found.
+
+    returns:
+        units: An array of tree-formatted code, or None if the code can
+        not be split. This is the case when access modifiers or case
+        labels are found at the top level.
+    """
+
+    if not make_indented:
+        return [[node] for node in code]
+
+    re_class_curly = re.compile('^(class|struct|typedef|enum|union)( [^;]*|)$')
+    re_access_modifier = re.compile('^(public|private|protected)( *):$')
+    re_switch = re.compile("^(case( .*|'.'|)|default *):$")
+
+    units = []
+    isJoined = False
+    for node in code:
+        if re_access_modifier.search(node[1]) or re_switch.search(node[1]):
+            return None
+        if isJoined:
+            units[-1].append(node)
+        else:
+            units.append([node])
+        isJoined = node[1] == "do" or bool(re_class_curly.search(node[1]))
+    return units
+
+
+def transform_cached(code, make_indented, cache, macros=None):
+    """The same as transform(), except that top-level units that have
+    been converted before are taken from the cache.
+
+    Units are cached by their normalized text. Line numbers are replaced
+    by their rank among the line numbers of the unit, so a unit is found
+    no matter where it is located within a file. The ranks of a cached
+    result are then mapped onto the line numbers of the new location.
+
+    args:
+        code: Tree-formatted source code.
+        make_indented: True for indentation syntax, False for curly
+            braces syntax.
+        cache: An LRUCache instance.
+        macros: An optional frozenset of macro names, see add_semicolon().
+    """
+
+    def _walk(_code, _depth, _parts):
+        for node in _code:
+            _parts.append((_depth, node[0], node[1]))
+            _walk(node[2], _depth + 1, _parts)
+        return _parts
+
+    def _relabel_tree(_code, _table):
+        return [[_table[node[0]], node[1], _relabel_tree(node[2], _table)] for node in _code]
+
+    def _relabel(_lines, _mv1, _mv2, _table):
+        _table = {**_table, None: None}
+        _lines = [[_table[l[0]], *l[1:]] for l in _lines]
+        _mv1 = {_table[k]: _table[v] for k, v in _mv1.items()}
+        _mv2 = {_table[k]: _table[v] for k, v in _mv2.items()}
+        return _lines, _mv1, _mv2
+
+    units = split_units(code, make_indented)
+    if units is None:
+        return transform(code, make_indented, macros)
+
+    out_code = []
+    mv1 = dict()
+    mv2 = dict()
+    for unit in units:
+        parts = _walk(unit, 0, [])
+        line_nums = sorted(set([part[1] for part in parts]))
+        rank = {line_num: n for n, line_num in enumerate(line_nums)}
+        key = (make_indented, IND_AMT, macros, "\n".join(
+            ["%d %d %s" % (depth, rank[line_num], text) for depth, line_num, text in parts]))
+
+        res = cache.get(key)
+        if res is None:
+            res = transform(_relabel_tree(unit, rank), make_indented, macros)
+            cache.put(key, res)
+        u_code, u_mv1, u_mv2 = _relabel(*res, dict(enumerate(line_nums)))
+
+        out_code += u_code
+        mv1.update(u_mv1)
+        mv2.update(u_mv2)
+    return out_code, mv1, mv2
+
+
+def parse_tree(raw_code, make_indented=None, macros=None, comments=True):
+    """Parse source code into a tree snapshot, which convert_tree()
+    converts without parsing the source again. See Tree snapshots.
+
+    args:
+        raw_code: The source code as a single string.
+        make_indented: True if raw_code has curly braces syntax, False
+            if it has indented syntax, the same as for convert(), or
+            None to detect it.
+        macros: An optional set of names of macros that expand to
+            statements or block delimiters, see MacroIndex.
+        comments: False to drop the comments, in which case the
+            comments of the snapshot are empty.
+
+    returns:
+        snapshot: [make_indented, macros, nested_code, block_comments,
+            line_comments]"""
+
+    if make_indented == None:
+        make_indented, confidence = detect_syntax(raw_code)
+
+    code, bcoms, coms = parse_raw_code(raw_code, comments=comments)
+
+    # Fall back on all lines of the parsed code if the syntax could not
+    # be detected from the raw text.
+    if make_indented == None:
+        make_indented = isCurly(code)
+
+    if macros is not None:
+        macros = frozenset(macros)
+
+    if make_indented:
+        c2 = nest_curly(code, macros)
+    else:
+        c2 = nest_indented(code)
+
+    return [make_indented, macros, c2, bcoms, coms]
+
+
+def convert_tree(snapshot, raw_code, line_file=None, cache=None):
+    """Convert a tree snapshot of source code, see parse_tree(). The
+    snapshot is not modified. See convert_lines() for the arguments.
+
+    returns:
+        out_code: source code as an array of lines."""
+
+    make_indented, macros, c2, bcoms, coms = snapshot
+
+    if cache is None:
+        c8, mv1, mv2 = transform(c2, make_indented, macros)
+    else:
+        c8, mv1, mv2 = transform_cached(c2, make_indented, cache, macros)
+
+    mv = {**mv1, **mv2}
+    c9 = merge_comments(c8, bcoms, coms, mv)
+    c10 = block_comments_expand(c9, raw_code)
+    c11 = cosmetic_lines(c10)
+
+    if line_file is not None and not make_indented:
+        c11 = add_line_directives(c11, line_file, raw_code)
+
+    return c11
+
+
+def convert_lines(raw_code, make_indented=None, line_file=None, cache=None, macros=None):
+    """Convert source code and return it as an array of lines, each of
+    the form [white_space, code, block_comment, line_comment, line_ref].
+
+    args:
+        raw_code: The source code as a single string.
+        make_indented: True to convert into indented syntax, False to
+            convert into curly braces syntax, or None to detect it.
+        line_file: If given, and code is converted into curly braces
+            syntax, "#line" directives referring to this filename are
+            added to the output.
+        cache: An optional LRUCache of converted top-level units. Sharing
+            one cache between conversions skips the transformations of
+            declarations that have been converted before.
+        macros: An optional set of names of macros that expand to
+            statements or block delimiters, see MacroIndex.
+
+    returns:
+        out_code: source code as an array of lines."""
+
+    return convert_tree(parse_tree(raw_code, make_indented, macros), raw_code, line_file, cache)
+
+
+def tree_key(raw_code, make_indented=None, macros=None):
+    """The content hash that the tree snapshot of source code is stored
+    with. It covers the source and the options of parse_tree()."""
+
+    import hashlib
+
+    h = hashlib.sha1(raw_code.encode("utf-8", "surrogateescape"))
+    h.update(("\0%r %r" % (make_indented, sorted(macros) if macros is not None else None)).encode())
+    return h.hexdigest()
+
+
+def tree_dumps(snapshot, key):
+    """Serialize a tree snapshot, together with the key of its source,
+    see tree_key()."""
+
+    import marshal
+
+    return TREE_MAGIC + marshal.dumps([TREE_VERSION, key, snapshot], 4)
+
+
+def tree_loads(data, key=None):
+    """Deserialize a tree snapshot.
+
+    args:
+        data: The result of tree_dumps().
+        key: If given, the key that the snapshot must have been stored
+            under.
+
+    returns:
+        snapshot: The tree snapshot, or None if it was written by
+            another version of the format, or under another key.
+    """
+
+    import marshal
+
+    if data[:len(TREE_MAGIC)] != TREE_MAGIC:
+        raise ValueError("not a THINC tree snapshot")
+    version, data_key, snapshot = marshal.loads(data[len(TREE_MAGIC):])
+    if version != TREE_VERSION or (key is not None and data_key != key):
+        return None
+    return snapshot
+
+
+def tree_snapshot(fn, make_indented=None, macros=None, cache_dir=None):
+    """Read the tree snapshot of a source file from the cache, or parse
+    the file and store its snapshot in the cache. Each source has one
+    slot in the directory ".thinc-tree" next to it, named after the
+    source, e.g. "foo.ic.tree", which is overwritten when the source
+    changes. The slot holds the content hash of the source, see
+    tree_key(), so a snapshot is never stale. If the cache cannot be
+    written, the snapshot is only returned.
+
+    args:
+        fn: The filename of the source.
+        make_indented, macros: See parse_tree().
+        cache_dir: The cache directory, if not the default. Sources
+            with the same name share a slot, which is then overwritten
+            in turn.
+
+    returns:
+        snapshot: The tree snapshot, see parse_tree().
+        raw_code: The source code, which comment spans refer to.
+    """
+
+    raw_code = readFile(fn)
+    key = tree_key(raw_code, make_indented, macros)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(fn), TREE_DIR)
+    fn_tree = os.path.join(cache_dir, os.path.basename(fn) + ".tree")
+
+    try:
+        with open(fn_tree, "rb") as f:
+            snapshot = tree_loads(f.read(), key)
+        if snapshot is not None:
+            return snapshot, raw_code
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+
+    snapshot = parse_tree(raw_code, make_indented, macros)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fn_tmp = "%s.%d.tmp" % (fn_tree, os.getpid())
+        with open(fn_tmp, "wb") as f:
+            f.write(tree_dumps(snapshot, key))
+        os.replace(fn_tmp, fn_tree)
+    except OSError:
+        pass
+    return snapshot, raw_code
+
+
+def convert(raw_code, make_indented=None, line_file=None, cache=None, macros=None):
+    """Convert source code between curly braces syntax and indented
+    syntax. See convert_lines() for the arguments."""
+
+    return code_join(convert_lines(raw_code, make_indented, line_file, cache, macros), raw_code)
+
+
+def lean_join(code, make_indented, line_file=None):
+    """Join lines of converted code, as returned by transform(), into a
+    single string, without comments and without cosmetic changes.
+
+    The lines of the source keep their line numbers wherever possible.
+    Blank lines are inserted in place of the lines of the source that
+    have no code, and lines that were created by the conversion, e.g.
+    closing curly braces, are appended to the previous line of curly
+    braces syntax. Where a line lands after its original line number,
+    e.g. the condition of a do-while loop, it is put on a line of its
+    own after a "#line" directive that refers to line_file, if it is
+    given, and appended to the previous line otherwise.
+
+    args:
+        code: source code as an array of lines of the form
+            [line_num, white_space, code].
+        make_indented: True for indentation syntax, False for curly
+            braces syntax.
+        line_file: The name of the original source file, for "#line"
+            directives in curly braces syntax.
+
+    returns:
+        out_code: The source code as a single string.
+    """
+
+    out_code = []
+    if make_indented:
+        line_file = None
+    if line_file is not None:
+        line_file = line_file.replace("\\", "\\\\").replace("\"", "\\\"")
+        out_code.append('#line 1 "%s"' % line_file)
+    expected = 0 # The line number of the next line of out_code
+    isRewound = False # True after a directive to an earlier line
+    isContinued = False
+    for row in code:
+        ref, line = row[0], row[2]
+        if not line:
+            # e.g. the place of a closing curly brace
+            continue
+        # Lines that were created by the conversion have no line number.
+        # A line that comes after its original line number, e.g. the
+        # condition of a do-while loop, is appended as well if it can
+        # not be given a directive, or if it is a bare semi-colon that
+        # ends a structure.
+        isMoved = ref is None or ref < expected and (line_file is None or line == ";")
+        # Lines cannot be appended to pre-processor directives, nor can
+        # directives be appended to other lines.
+        if isMoved and not make_indented and out_code and not isContinued \
+                and line[:1] != "#" and out_code[-1].lstrip()[:1] != "#":
+            out_code[-1] += " " + line
+            isContinued = line[-1:] == "\\"
+            continue
+
+        if not (isMoved or isContinued):
+            # Return from an earlier line with another directive, rather
+            # than with blank lines.
+            if ref > expected and not isRewound:
+                out_code += [""]*(ref - expected)
+                expected = ref
+            elif ref != expected and line_file is not None:
+                out_code.append('#line %d "%s"' % (ref + 1, line_file))
+                isRewound = ref < expected
+                expected = ref
+        out_code.append(row[1] + line)
+        expected += 1
+        isContinued = line[-1:] == "\\"
+    return "\n".join(out_code)
+
+
+def convert_lean(raw_code, make_indented=None, line_file=None, macros=None):
+    """Convert source code for a compiler, rather than for people to
+    read. Comments are dropped while the source is parsed, and the code
+    is joined straight from transform(), without merging comments or
+    cosmetic changes, see lean_join(). The arguments are those of
+    convert_lines(), except that no cache is used.
+
+    returns:
+        out_code: The source code as a single string.
+    """
+
+    make_indented, macros, c2, bcoms, coms = parse_tree(raw_code, make_indented, macros, comments=False)
+    c8, mv1, mv2 = transform(c2, make_indented, macros)
+    return lean_join(c8, make_indented, line_file)
+
+
+def outline(raw_code, make_indented=None, cache=None):
+    """List the functions, types, namespaces, and access sections of
+    source code, e.g. for the outline view of an editor. Only the
+    parsing and tree building stages of a conversion are run.
+
+    args:
+        raw_code: The source code as a single string.
+        make_indented: True if raw_code has curly braces syntax, False
+            if it has indented syntax, the same as for convert(), or
+            None to detect it.
+        cache: An optional LRUCache. Outlines are cached by the SHA-1
+            hash of raw_code.
+
+    returns:
+        symbols: An array of (kind, name, first_line, last_line, depth)
+            tuples in the order of the source, where kind is one of
+            "function", "class", "struct", "union", "enum", "typedef",
+            "namespace", and "access". Line numbers start from 1 and
+            the last line is included. Depth counts the symbols that
+            enclose a symbol. Anonymous types have an empty name.
+    """
+
+    if cache is not None:
+        import hashlib
+
+        key = ("outline", make_indented,
+            hashlib.sha1(raw_code.encode("utf-8", "surrogateescape")).digest())
+        symbols = cache.get(key)
+        if symbols is None:
+            symbols = outline(raw_code, make_indented)
+            cache.put(key, symbols)
+        return list(symbols)
+
+    re_type = re.compile('^(template *<.*> *)?(?P<typedef>typedef +)?(?P<kind>class|struct|union|enum|namespace)\\b'
+        '( +(class|struct)\\b)? *(?P<name>[a-zA-Z_][a-zA-Z0-9_]*(::[a-zA-Z_][a-zA-Z0-9_]*)*)? *(,(?P<aliases>[^:]*))?')
+    re_access = re.compile('^(public|private|protected) *:?$')
+    re_control = re.compile('^(if|else|for|while|do|switch|try|catch|case|default|return)\\b')
+    re_qualifier = re.compile('(?:[a-zA-Z_~][a-zA-Z0-9_~]*::)*')
+    re_name = re.compile('~?[a-zA-Z_][a-zA-Z0-9_]*$')
+    re_operator = re.compile('(?<![a-zA-Z0-9_~])operator *[^ (]+$')
+    name_chars = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_~:")
+    re_alias = re.compile('^([a-zA-Z_][a-zA-Z0-9_]*)( *, *[a-zA-Z_*][a-zA-Z0-9_* ]*)* *;$')
+
+    make_indented, macros, tree, bcoms, coms = parse_tree(raw_code, make_indented, comments=False)
+
+    def _function_name(_header):
+        """Find the possibly qualified name, or operator, in front of
+        the first parenthesis that follows one. Names are matched
+        backwards from each parenthesis, over the characters up to the
+        previous one, so the header is scanned in linear time."""
+        p = _header.find("(")
+        while p >= 0:
+            e = p
+            while e > 0 and _header[e-1] == " ":
+                e -= 1
+
+            # A name is the run of name characters in front of the
+            # parenthesis, or its last part if the run is not a valid
+            # qualified name.
+            start = e
+            while start > 0 and _header[start-1] in name_chars:
+                start -= 1
+            while _header[start:start+1] == ":":
+                start += 1
+            run = _header[start:e]
+            r = re_qualifier.match(run)
+            if not re_name.match(run, r.end()):
+                r = re_name.search(run, run.rfind(":") + 1)
+                start = start + r.start() if r else None
+            end = e
+
+            # An operator, whose symbol may not consist of name
+            # characters. The parameters of "operator()" follow its
+            # parentheses.
+            op_start = None
+            if _header[max(0, e-8):e] == "operator" and _header[p:p+2] == "()" \
+                    and _header[p+2:].lstrip(" ")[:1] == "(":
+                op_start, op_end = e - 8, p + 2
+            else:
+                r = re_operator.search(_header, max(0, e-32), e)
+                if r:
+                    op_start, op_end = r.start(), e
+            if op_start is not None:
+                run_end = op_start
+                while op_start > 0 and _header[op_start-1] in name_chars:
+                    op_start -= 1
+                if re_qualifier.match(_header, op_start, run_end).end() != run_end:
+                    op_start = run_end
+                if start is None or op_start <= start:
+                    start, end = op_start, op_end
+
+            if start is not None:
+                return _header[start:end]
+            p = _header.find("(", p + 1)
+        return None
+
+    def _last_line(_node):
+        while _node[2]:
+            _node = _node[2][-1]
+        return _node[0]
+
+    def _walk(_code, _depth, _symbols):
+        n_access = None # index of the open access section of curly code
+        for n in range(len(_code)):
+            node = _code[n]
+            header = node[1]
+            if not make_indented and header[-1:] == ":":
+                header = header[:-1].rstrip()
+
+            r = re_access.search(node[1])
+            if r and (node[2] or make_indented):
+                if n_access is not None:
+                    _symbols[n_access][3] = _last_line(_code[n-1]) + 1
+                n_access = len(_symbols)
+                _symbols.append(["access", r.group(1), node[0] + 1, _last_line(node) + 1, _depth])
+                if node[2]:
+                    n_access = None
+                    _walk(node[2], _depth + 1, _symbols)
+                continue
+
+            # An empty block of indented code is a line with a colon.
+            if not (node[2] or (not make_indented and node[1][-1:] == ":")):
+                continue
+
+            # Members of an access section of curly code are its
+            # siblings in the tree.
+            depth = _depth + (n_access is not None)
+
+            # e.g. "struct S s = {", whose block is an initializer
+            r = re_type.search(header)
+            if r and "=" in header[r.end("kind"):]:
+                r = None
+            if r:
+                kind = "typedef" if r.group("typedef") else r.group("kind")
+                name = r.group("name") or ""
+                if r.group("typedef"):
+                    # The name of a typedef is its first alias.
+                    if r.group("aliases") and r.group("aliases").strip():
+                        name = r.group("aliases").split(",")[0].strip()
+                    elif n + 1 < len(_code) and re_alias.search(_code[n+1][1]):
+                        name = re_alias.search(_code[n+1][1]).group(1)
+                _symbols.append([kind, name, node[0] + 1, _last_line(node) + 1, depth])
+                _walk(node[2], depth + 1, _symbols)
+                continue
+
+            name = _function_name(header)
+            if name is not None and not re_control.search(header):
+                _symbols.append(["function", name, node[0] + 1, _last_line(node) + 1, depth])
+                continue
+
+            # e.g. extern "C" blocks
+            _walk(node[2], depth, _symbols)
+
+        if n_access is not None:
+            # Closing curly braces are empty nodes, which do not belong
+            # to the last access section.
+            last = len(_code) - 1
+            while last > 0 and not _code[last][1]:
+                last -= 1
+            _symbols[n_access][3] = _last_line(_code[last]) + 1
+        return _symbols
+
+    return [tuple(symbol) for symbol in _walk(tree, 0, [])]
+
+
+def count_lines(text):
+    """Count the lines of a string, including a last unterminated line."""
+    return text.count("\n") + (text[-1:] not in ("", "\n"))
+
+
+class Telemetry:
+    """Throughput counters of a multi-file run. Each converted file is
+    recorded with its line counts, byte counts, and conversion time.
+
+    args:
+        cache: An optional LRUCache, whose statistics are included in
+            the reports.
+    """
+
+    def __init__(self, cache=None):
+        import time
+
+        self.cache = cache
+        self.files = []
+        self.start = time.perf_counter()
+
+    def add(self, fn, lines_in, lines_out, bytes_in, bytes_out, seconds):
+        """Record one converted file."""
+        self.files.append((fn, lines_in, lines_out, bytes_in, bytes_out, seconds))
+
+    def totals(self):
+        """Sum up the counters.
+
+        returns:
+            totals: A dictionary of counter names and values.
+        """
+
+        import time
+
+        wall = time.perf_counter() - self.start
+        totals = {
+            "files": len(self.files),
+            "input_lines": sum([f[1] for f in self.files]),
+            "output_lines": sum([f[2] for f in self.files]),
+            "input_bytes": sum([f[3] for f in self.files]),
+            "output_bytes": sum([f[4] for f in self.files]),
+            "convert_seconds": sum([f[5] for f in self.files]),
+            "wall_seconds": wall,
+        }
+        totals["files_per_second"] = totals["files"] / wall if wall else 0.0
+        totals["lines_per_second"] = totals["input_lines"] / wall if wall else 0.0
+        if self.cache is not None:
+            totals["unit_cache_hits"] = self.cache.hits
+            totals["unit_cache_misses"] = self.cache.misses
+        return totals
+
+    def slowest(self, top=10):
+        """The records of the slowest files, slowest first."""
+        return sorted(self.files, key=lambda f: -f[5])[:top]
+
+    def report(self, top=10):
+        """A human-readable summary, followed by the slowest files."""
+
+        t = self.totals()
+        lines = ["%d files, %d lines (%d bytes) in, %d lines (%d bytes) out, %.2f s" % (
+                t["files"], t["input_lines"], t["input_bytes"], t["output_lines"],
+                t["output_bytes"], t["wall_seconds"]),
+            "%.1f files/s, %.0f lines/s" % (t["files_per_second"], t["lines_per_second"])]
+        if self.cache is not None:
+            lines.append("unit cache: " + self.cache.report())
+        if self.files:
+            lines.append("slowest files:")
+            for f in self.slowest(top):
+                lines.append("  %8.3f s %8d lines  %s" % (f[5], f[1], f[0]))
+        return "\n".join(lines) + "\n"
+
+    def json(self, top=10):
+        """The counters and the slowest files as JSON."""
+
+        import json
+
+        slowest = [{"file": f[0], "input_lines": f[1], "output_lines": f[2],
+                    "input_bytes": f[3], "output_bytes": f[4], "seconds": f[5]}
+                   for f in self.slowest(top)]
+        return json.dumps({**self.totals(), "slowest": slowest}, indent=1) + "\n"
+
+    def prometheus(self, top=10):
+        """The counters and the slowest files in the Prometheus text
+        exposition format."""
+
+        def _label(_s):
+            return _s.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+        t = self.totals()
+        lines = []
+        for name, value in t.items():
+            kind = "gauge" if name.endswith(("_per_second", "wall_seconds")) else "counter"
+            metric = "thinc_" + name + ("_total" if kind == "counter" else "")
+            lines.append("# TYPE %s %s" % (metric, kind))
+            lines.append("%s %s" % (metric, repr(float(value)) if isinstance(value, float) else value))
+        lines.append("# TYPE thinc_file_seconds gauge")
+        for f in self.slowest(top):
+            lines.append('thinc_file_seconds{file="%s"} %r' % (_label(f[0]), f[5]))
+        return "\n".join(lines) + "\n"
+
+    def write(self, fn, top=10):
+        """Write the counters into a file. JSON is written if the
+        filename ends with ".json", and the Prometheus text format
+        otherwise."""
+
+        if fn.endswith(".json"):
+            writeFile(fn, self.json(top))
+        else:
+            writeFile(fn, self.prometheus(top))
+
+
+def output_name(fn, make_indented=None):
+    """Determine the name of a converted file from its filename
+    extension.
+
+    args:
+        fn: The filename of the source.
+        make_indented: True to only accept curly braces syntax sources,
+            False to only accept indented syntax sources, or None to
+            accept both.
+
+    returns:
+        fn_out: The filename of the converted file, or None if fn is not
+            a source file of the requested syntax.
+        make_indented: The direction of the conversion.
+    """
+
+    base, dot, ext = fn.rpartition(".")
+    ext = dot + ext
+    if base and make_indented != False and ext in INDENTED_EXT:
+        return base + INDENTED_EXT[ext], True
+    if base and make_indented != True and ext in CURLY_EXT:
+        return base + CURLY_EXT[ext], False
+    return None, None
+
+
+def header_names(name):
+    """List the names under which an included header may be found: its
+    own name, followed by the name of its counterpart in the other
+    syntax, e.g. "foo.ih" for "foo.h". Sources may refer to a header by
+    the name that it will have after the conversion."""
+
+    base, dot, ext = name.rpartition(".")
+    names = [name]
+    if base and dot + ext in INDENTED_EXT:
+        names.append(base + INDENTED_EXT[dot + ext])
+    if base and dot + ext in CURLY_EXT:
+        names.append(base + CURLY_EXT[dot + ext])
+    return names
+
+
+def isArchive(fn):
+    """Determine from the filename extension if a file is an archive."""
+    fn = fn.lower()
+    return fn.endswith(".zip") or any(map(fn.endswith, TAR_MODES))
+
+
+def convert_archive(fn_in, fn_out, make_indented=None, cache=None, telemetry=None):
+    """Convert the source files within an archive, and write them into a
+    new archive. Members are streamed from one archive into the other,
+    so that at most one member is held in memory at any time. Nothing is
+    extracted to disk.
+
+    A hard link of a tar archive is written as a copy of its target if
+    the new archive is a zip, which has no hard links, or if the target
+    is converted, which changes its name. The targets of these links
+    are read in a second pass over the archive. A relative symbolic link
+    to a source is pointed to the converted source. Members that can not
+    be written, e.g. devices in a zip, are skipped with a warning.
+
+    args:
+        fn_in: The filename of a zip or tar archive. Tar archives may be
+            compressed with gzip, bzip2, or xz.
+        fn_out: The filename of the new archive. The format is chosen by
+            its filename extension.
+        make_indented: True to only convert curly braces syntax sources,
+            False to only convert indented syntax sources, or None to
+            convert both. Other members are copied unchanged.
+        cache: An optional LRUCache, see convert_lines().
+        telemetry: An optional Telemetry, which records every converted
+            member.
+
+    returns:
+        count: The number of converted members.
+    """
+
+    import io
+    import copy
+    import stat
+    import time
+    import shutil
+    import tarfile
+    import zipfile
+
+    def _read_tar(_fn):
+        with tarfile.open(_fn, "r|*") as _tar:
+            for _info in _tar:
+                _f = _tar.extractfile(_info) if _info.isreg() else None
+                yield _info, _f
+
+    def _read_zip(_fn):
+        with zipfile.ZipFile(_fn) as _zip:
+            for _zinfo in _zip.infolist():
+                # Members are described by TarInfo, the richer format.
+                _info = tarfile.TarInfo(_zinfo.filename.rstrip("/"))
+                _info.mtime = time.mktime(_zinfo.date_time + (0, 0, -1))
+                _info.mode = (_zinfo.external_attr >> 16) & 0o7777 or 0o644
+                if _zinfo.is_dir():
+                    _info.type = tarfile.DIRTYPE
+                    yield _info, None
+                elif stat.S_ISLNK(_zinfo.external_attr >> 16):
+                    # The target of a symbolic link is its content.
+                    _info.type = tarfile.SYMTYPE
+                    _info.linkname = _zip.read(_zinfo).decode("utf-8", "surrogateescape")
+                    yield _info, None
+                else:
+                    _info.size = _zinfo.file_size
+                    with _zip.open(_zinfo) as _f:
+                        yield _info, _f
+
+    def _write_tar(_tar, _info, _f):
+        _tar.addfile(_info, _f)
+
+    def _write_zip(_zip, _info, _f):
+        date_time = time.localtime(max(_info.mtime, 315532800))[:6]
+        if _info.isdir():
+            _zinfo = zipfile.ZipInfo(_info.name + "/", date_time)
+            _zinfo.external_attr = (0o40000 | _info.mode) << 16 | 0x10
+            _zip.writestr(_zinfo, b"")
+        elif _info.issym():
+            _zinfo = zipfile.ZipInfo(_info.name, date_time)
+            _zinfo.external_attr = (0o120000 | 0o777) << 16
+            _zip.writestr(_zinfo, _info.linkname)
+        elif _info.isreg():
+            _zinfo = zipfile.ZipInfo(_info.name, date_time)
+            _zinfo.external_attr = (0o100000 | _info.mode) << 16
+            _zinfo.compress_type = zipfile.ZIP_DEFLATED
+            _zinfo.file_size = _info.size
+            with _zip.open(_zinfo, "w") as _f_out:
+                shutil.copyfileobj(_f, _f_out)
+        else:
+            sys.stderr.write("thinc: %s: skipped, a zip cannot hold this type of member\n" % _info.name)
+
+    if zipfile.is_zipfile(fn_in):
+        members = _read_zip(fn_in)
+    else:
+        members = _read_tar(fn_in)
+
+    if fn_out.lower().endswith(".zip"):
+        archive = zipfile.ZipFile(fn_out, "w")
+        write = _write_zip
+    else:
+        mode = [TAR_MODES[ext] for ext in TAR_MODES if fn_out.lower().endswith(ext)]
+        archive = tarfile.open(fn_out, mode[-1] if mode else "w|")
+        write = _write_tar
+
+    def _retarget(_info):
+        # A relative symbolic link to a source follows the source to its
+        # new name, and is renamed as well if it is named as a source.
+        _target = None if os.path.isabs(_info.linkname) else output_name(_info.linkname, make_indented)[0]
+        if _target is None:
+            return _info
+        _info = copy.copy(_info)
+        _info.linkname = _target
+        _info.name = output_name(_info.name, make_indented)[0] or _info.name
+        return _info
+
+    def _add(_info, _f):
+        # Write a member, converted if it is a source. Returns True if
+        # it was converted.
+        name, mi = output_name(_info.name, make_indented) if _f else (None, None)
+        if name is not None:
+            t0 = time.perf_counter()
+            data_in = _f.read()
+            code_in = data_in.decode("utf-8", "surrogateescape")
+            code_out = convert(code_in, mi, cache=cache)
+            data = code_out.encode("utf-8", "surrogateescape")
+            if telemetry is not None:
+                telemetry.add(_info.name, count_lines(code_in), count_lines(code_out),
+                    len(data_in), len(data), time.perf_counter() - t0)
+            _info = copy.copy(_info)
+            _info.name = name
+            _info.size = len(data)
+            _f = io.BytesIO(data)
+        write(archive, _info, _f)
+        return name is not None
+
+    count = 0
+    converted = set() # Names of the converted members
+    links = dict()    # Hard links to copy, by the names of their targets
+    with archive:
+        for info, f in members:
+            if info.islnk() and (write is _write_zip or info.linkname in converted):
+                links.setdefault(info.linkname, []).append(info)
+                continue
+            if info.issym():
+                info = _retarget(info)
+            if _add(info, f):
+                converted.add(info.name)
+                count += 1
+
+        if links:
+            for info, f in _read_tar(fn_in):
+                if info.name in links and f is not None:
+                    data = f.read()
+                    for link in links.pop(info.name):
+                        link = copy.copy(link)
+                        link.type = tarfile.REGTYPE
+                        link.linkname = ""
+                        link.size = len(data)
+                        count += _add(link, io.BytesIO(data))
+        for target in links:
+            for link in links[target]:
+                sys.stderr.write("thinc: %s: skipped, the target of the link was not found\n" % link.name)
+
+    return count
+
+
+def source_files(paths, exts):
+    """List source files. Directories are searched recursively for
+    files having one of the given filename extensions. Files that are
+    named explicitly are always listed."""
+
+    fns = []
+    for path in paths:
+        if not os.path.isdir(path):
+            fns.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for fn in sorted(files):
+                if "." + fn.rpartition(".")[2] in exts:
+                    fns.append(os.path.join(root, fn))
+    return fns
+
+
+def parallel_map(func, items, jobs=None):
+    """Apply a function to every item, using up to "jobs" worker
+    processes. The results are returned in the order of the items."""
+
+    if jobs == None:
+        jobs = os.cpu_count() or 1
+    if jobs <= 1 or len(items) <= 1:
+        return list(map(func, items))
+
+    import concurrent.futures
+
+    with concurrent.futures.ProcessPoolExecutor(min(jobs, len(items))) as executor:
+        return list(executor.map(func, items, chunksize=max(1, len(items)//(jobs*8))))
+
+
+def local_includes(raw_code):
+    """List the headers that source code includes with quotes."""
+    re_include = re.compile('^[ \t]*#[ \t]*include[ \t]*"([^"]+)"', re.M)
+    return re_include.findall(raw_code)
+
+
+def include_graph(fns, codes, include_path=()):
+    """Construct the graph of local includes among a set of files.
+
+    An include is resolved relative to the including file, and then
+    relative to each directory of the include path, see header_names().
+
+    args:
+        fns: Filenames.
+        codes: The source code of each file.
+        include_path: Additional directories to search.
+
+    returns:
+        deps: A dictionary of { filename: [included filename, ...], ... },
+        where only included files that are among fns are listed.
+    """
+
+    known = set(map(os.path.normpath, fns))
+    deps = dict()
+    for fn, raw_code in zip(fns, codes):
+        deps[fn] = []
+        for name in local_includes(raw_code):
+            names = header_names(name)
+            for d in [os.path.dirname(fn)] + list(include_path):
+                found = [p for p in [os.path.normpath(os.path.join(d, n)) for n in names] if p in known]
+                if found:
+                    if found[0] not in deps[fn]:
+                        deps[fn].append(found[0])
+                    break
+    return deps
+
+
+def include_levels(deps):
+    """Order files so that every file comes after the files it includes.
+
+    args:
+        deps: An include graph, see include_graph().
+
+    returns:
+        levels: An array of arrays of filenames. The files of a level
+        only include files of earlier levels, so they can be processed
+        in parallel. Includes that form a cycle are ignored.
+    """
+
+    level = dict()
+    def _level(fn, visiting):
+        if fn not in level:
+            visiting.add(fn)
+            level[fn] = 1 + max([_level(d, visiting) for d in deps[fn] if d not in visiting] + [-1])
+            visiting.discard(fn)
+        return level[fn]
+
+    levels = []
+    for fn in deps:
+        N = _level(fn, set())
+        while len(levels) <= N:
+            levels.append([])
+    for fn in deps:
+        levels[level[fn]].append(fn)
+    return levels
+
+
+def convert_file(args):
+    """Convert a file and write the result, for use with parallel_map().
+
+    args:
+        args: A tuple of (fn_in, fn_out, make_indented, macros).
+
+    returns:
+        record: A tuple of (fn_in, lines_in, lines_out, bytes_in,
+        bytes_out, seconds), see Telemetry.add().
+    """
+
+    import time
+
+    fn_in, fn_out, make_indented, macros = args
+    t0 = time.perf_counter()
+    code_in = readFile(fn_in)
+    new_lines = convert(code_in, make_indented, macros=macros)
+    os.makedirs(os.path.dirname(fn_out) or ".", exist_ok=True)
+    writeFile(fn_out, new_lines)
+    return (fn_in, count_lines(code_in), count_lines(new_lines),
+            len(code_in.encode("utf-8", "surrogateescape")),
+            len(new_lines.encode("utf-8", "surrogateescape")), time.perf_counter() - t0)
+
+
+def file_sha1(fn):
+    """The SHA-1 hex digest of a file's content, or None if it can not
+    be read."""
+
+    import hashlib
+
+    h = hashlib.sha1()
+    try:
+        with open(fn, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                h.update(block)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def converter_sha1():
+    """The SHA-1 hex digest of the source of this module, which tells
+    apart versions of the converter, or None if it can not be read."""
+
+    import hashlib
+
+    try:
+        return hashlib.sha1(__loader__.get_data(__file__)).hexdigest()
+    except (AttributeError, OSError):
+        return None
+
+
+def project_plan(src_dir, out_dir, make_indented=None, macro_index=None):
+    """Plan the conversion of every source file of a directory tree into
+    another directory tree.
+
+    Files are ordered by their local includes, see include_levels(). The
+    key of a file is the hash of its content, the options, the version
+    of the converter, see converter_sha1(), its macro names, which may
+    come from headers outside of the tree, and the keys of all files
+    that it includes. The keys of the last run are kept in
+    the state file of the output directory, together with the hash of
+    each output.
+
+    args:
+        src_dir: The directory of the sources.
+        out_dir: The directory of the converted files.
+        make_indented: True to only convert curly braces syntax sources,
+            False to only convert indented syntax sources, or None to
+            convert both.
+        macro_index: An optional MacroIndex, see convert_lines().
+
+    returns:
+        levels: An array of levels, where each level is an array of
+            tasks: (fn_in, fn_out, make_indented, macros, rel, state),
+            and "state" is the entry of the file in the new state.
+        fn_state: The filename of the state file.
+        state: The state of the last run.
+    """
+
+    import hashlib
+    import json
+
+    fn_state = os.path.join(out_dir, ".thinc-state.json")
+    try:
+        state = json.loads(readFile(fn_state))
+    except (OSError, ValueError):
+        state = dict()
+
+    # Filenames are normalized, as include_graph() resolves includes to
+    # normalized paths.
+    fns = [os.path.normpath(fn) for fn in source_files([src_dir], {**INDENTED_EXT, **CURLY_EXT})
+           if output_name(fn, make_indented)[0]]
+    codes = [readFile(fn) for fn in fns]
+    include_path = macro_index.include_path if macro_index else ()
+    deps = include_graph(fns, codes, include_path)
+    code_of = dict(zip(fns, codes))
+    macros_of = {fn: macro_index.names(code_of[fn], fn) if macro_index else None for fn in fns}
+
+    options = "%r %r %r %r" % (make_indented, IND_AMT, include_path if macro_index else None, converter_sha1())
+    key = dict()
+    def _key(fn, visiting):
+        if fn not in key:
+            visiting.add(fn)
+            h = hashlib.sha1(options.encode())
+            h.update(code_of[fn].encode("utf-8", "surrogateescape"))
+            if macros_of[fn] is not None:
+                h.update(repr(sorted(macros_of[fn])).encode("utf-8", "surrogateescape"))
+            for d in deps[fn]:
+                if d not in visiting:
+                    h.update(_key(d, visiting).encode())
+            visiting.discard(fn)
+            key[fn] = h.hexdigest()
+        return key[fn]
+
+    levels = []
+    for level in include_levels(deps):
+        tasks = []
+        for fn in level:
+            rel = os.path.relpath(fn, src_dir)
+            rel_out, mi = output_name(rel, make_indented)
+            entry = {"key": _key(fn, set()), "output": rel_out}
+            tasks.append((fn, os.path.join(out_dir, rel_out), mi, macros_of[fn], rel, entry))
+        levels.append(tasks)
+    return levels, fn_state, state
+
+
+def isUpToDate(task, state):
+    """Determine from the state of the last run if the output of a task
+    of project_plan() is up to date. This is the case if the key of the
+    source is unchanged, and the output still has the recorded hash."""
+
+    old = state.get(task[4])
+    if not old or old.get("key") != task[5]["key"] or old.get("output") != task[5]["output"]:
+        return False
+    return old.get("output_sha1") == file_sha1(task[1])
+
+
+def convert_project(src_dir, out_dir, make_indented=None, jobs=None, macro_index=None, telemetry=None):
+    """Convert every source file of a directory tree into another
+    directory tree.
+
+    Files are converted in the order of their local includes: headers
+    come first, and files that do not depend on each other are converted
+    in parallel. Every file is converted exactly once per run.
+
+    The conversion is incremental. The state of the previous run is
+    kept in the output directory. A file is converted again only if it,
+    or one of the files it includes directly or indirectly, has changed,
+    or if its output is missing or has been modified.
+
+    args:
+        src_dir: The directory of the sources.
+        out_dir: The directory of the converted files.
+        make_indented: True to only convert curly braces syntax sources,
+            False to only convert indented syntax sources, or None to
+            convert both.
+        jobs: The number of worker processes.
+        macro_index: An optional MacroIndex, see convert_lines().
+        telemetry: An optional Telemetry, which records every converted
+            file.
+
+    returns:
+        converted: The source filenames that were converted.
+        skipped: The source filenames that were up to date.
+    """
+
+    import json
+
+    levels, fn_state, state = project_plan(src_dir, out_dir, make_indented, macro_index)
+
+    converted = []
+    skipped = []
+    new_state = dict()
+    for level in levels:
+        tasks = []
+        for task in level:
+            if isUpToDate(task, state):
+                skipped.append(task[0])
+                new_state[task[4]] = state[task[4]]
+            else:
+                tasks.append(task)
+        for task, record in zip(tasks, parallel_map(convert_file, [t[:4] for t in tasks], jobs)):
+            converted.append(record[0])
+            new_state[task[4]] = {**task[5], "output_sha1": file_sha1(task[1])}
+            if telemetry is not None:
+                telemetry.add(*record)
+
+    os.makedirs(out_dir, exist_ok=True)
+    writeFile(fn_state, json.dumps(new_state, indent=1, sort_keys=True))
+    return converted, skipped
+
+
+def text_matches_file(text, fn, block_size=1 << 16):
+    """Compare a string with the content of a text file. The file is read
+    block by block, and the comparison stops at the first block that
+    differs. Returns False if the file can not be read."""
+
+    try:
+        f = open(fn, 'r')
+    except OSError:
+        return False
+    with f:
+        pos = 0
+        for block in iter(lambda: f.read(block_size), ""):
+            if text[pos:pos+len(block)] != block:
+                return False
+            pos += len(block)
+    return pos == len(text)
+
+
+def check_file(args):
+    """Convert a file and compare the result with an existing output,
+    for use with parallel_map(). Nothing is written.
+
+    args:
+        args: A tuple of (fn_in, fn_out, make_indented, macros). If
+            make_indented is None, the syntax is detected with the
+            filename as a hint, as by main().
+
+    returns:
+        isFresh: True if the output matches the conversion.
+        record: A tuple for Telemetry.add().
+    """
+
+    import time
+
+    fn_in, fn_out, make_indented, macros = args
+    t0 = time.perf_counter()
+    code_in = readFile(fn_in)
+    if make_indented == None:
+        make_indented, confidence = detect_syntax(code_in, fn_in)
+    new_lines = convert(code_in, make_indented, macros=macros)
+    isFresh = text_matches_file(new_lines, fn_out)
+    return isFresh, (fn_in, count_lines(code_in), count_lines(new_lines),
+            len(code_in.encode("utf-8", "surrogateescape")),
+            len(new_lines.encode("utf-8", "surrogateescape")), time.perf_counter() - t0)
+
+
+def check_project(src_dir, out_dir, make_indented=None, jobs=None, macro_index=None, telemetry=None):
+    """Verify that the outputs of convert_project() are up to date,
+    without writing anything. Files whose key and output hash match the
+    state of the last run are not converted again. All others are
+    converted in parallel and compared with their outputs.
+
+    See convert_project() for the arguments.
+
+    returns:
+        stale: The output filenames that are missing or out of date.
+        checked: The number of files that were checked.
+    """
+
+    levels, fn_state, state = project_plan(src_dir, out_dir, make_indented, macro_index)
+
+    tasks = [task for level in levels for task in level if not isUpToDate(task, state)]
+    stale = []
+    for task, (isFresh, record) in zip(tasks, parallel_map(check_file, [t[:4] for t in tasks], jobs)):
+        if not isFresh:
+            stale.append(task[1])
+        if telemetry is not None:
+            telemetry.add(*record)
+    return stale, sum(map(len, levels))
+
+
+def emit_ninja(src_dir, out_dir, fn_ninja, make_indented=None, include_path=None, cmd=None):
+    """Write a ninja build file that converts every source file of a
+    directory tree into another directory tree, with one edge per file.
+
+    Each edge runs the command line of this module with "--if-changed",
+    and its rule sets "restat", so that outputs whose content did not
+    change do not trigger the edges that depend on them. The build file
+    regenerates itself when a directory of the tree changes, e.g. when
+    a file is added or removed. Files are only listed, not read. Every
+    edge also depends on the files of the converter, i.e. thinc.py and
+    thinclib.py, or the zip application, so that a new version of the
+    converter converts the tree again.
+
+    args:
+        src_dir: The directory of the sources.
+        out_dir: The directory of the converted files.
+        fn_ninja: The filename of the build file. Paths in the build
+            file are relative to its directory, where ninja runs.
+        make_indented: True to only convert curly braces syntax sources,
+            False to only convert indented syntax sources, or None to
+            convert both.
+        include_path: None, or the include path of "--macros". Since
+            macros may come from any header, every edge then depends on
+            all headers of the tree.
+        cmd: The command line that runs this module. Default is the
+            current interpreter and this file.
+
+    returns:
+        N: The number of conversion edges.
+    """
+
+    build_dir = os.path.dirname(os.path.abspath(fn_ninja))
+
+    def _rel(_path):
+        return os.path.relpath(os.path.abspath(_path), build_dir)
+
+    def _escape(_path):
+        return _path.replace("$", "$$").replace(" ", "$ ").replace(":", "$:").replace("\n", "")
+
+    def _quote(_arg):
+        if re.fullmatch("[a-zA-Z0-9_./=+-]+", _arg):
+            return _arg
+        return "'" + _arg.replace("'", "'\\''") + "'"
+
+    if cmd is None:
+        cmd = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "thinc.py")]
+    options = []
+    if include_path is not None:
+        options.append("--macros")
+        for d in include_path:
+            options += ["-I", _rel(d)]
+
+    src_rel = _rel(src_dir)
+    out_rel = _rel(out_dir)
+    out_abs = os.path.abspath(out_dir)
+    exts = {**INDENTED_EXT, **CURLY_EXT}
+    edges = {True: [], False: []}
+    headers = []
+    dirs_in = []
+    for root, dirs, files in os.walk(src_dir):
+        # The output tree may be inside of the source tree.
+        dirs[:] = sorted([d for d in dirs if os.path.abspath(os.path.join(root, d)) != out_abs])
+        rel_root = os.path.relpath(root, src_dir)
+        dirs_in.append(os.path.normpath(os.path.join(src_rel, rel_root)))
+        for fn in sorted(files):
+            ext = "." + fn.rpartition(".")[2]
+            if ext not in exts:
+                continue
+            fn_in = os.path.normpath(os.path.join(src_rel, rel_root, fn))
+            if CC_LANGUAGES[CURLY_EXT.get(ext, ext)].endswith("-header"):
+                headers.append(fn_in)
+            rel_out, mi = output_name(fn, make_indented)
+            if rel_out is not None:
+                edges[mi].append((os.path.normpath(os.path.join(out_rel, rel_root, rel_out)), fn_in))
+
+    # The files of this module: thinclib.py and its launcher, or the
+    # zip application that contains them.
+    module = os.path.abspath(__file__)
+    converter = [_rel(path) for path in (os.path.join(os.path.dirname(module), "thinc.py"), module,
+        os.path.dirname(module)) if os.path.isfile(path)]
+
+    regenerate = cmd + ["-i", src_rel, "-o", out_rel, "--emit-ninja", os.path.basename(fn_ninja)] + options
+    if make_indented is not None:
+        regenerate.append("-p" if make_indented else "-c")
+
+    lines = [
+        "# Generated by thinc.py --emit-ninja, do not edit.",
+        "thinc = " + " ".join(map(_quote, cmd)),
+        "",
+        "rule to_indented",
+        "  command = $thinc -i $in -o $out -p --if-changed" + "".join(" " + _quote(o) for o in options),
+        "  description = THINC $out",
+        "  restat = 1",
+        "",
+        "rule to_curly",
+        "  command = $thinc -i $in -o $out -c --if-changed" + "".join(" " + _quote(o) for o in options),
+        "  description = THINC $out",
+        "  restat = 1",
+        "",
+        "rule regenerate",
+        "  command = " + " ".join(map(_quote, regenerate)),
+        "  description = Regenerating $out",
+        "  generator = 1",
+        "",
+        "build %s: regenerate | %s" % (_escape(os.path.basename(fn_ninja)), " ".join(map(_escape, dirs_in + converter))),
+        "",
+    ]
+    implicit = []
+    # A phony target without inputs would always be out of date.
+    if converter:
+        lines += ["build converter: phony " + " ".join(map(_escape, converter)), ""]
+        implicit.append("converter")
+    if include_path is not None and headers:
+        lines += ["build headers: phony " + " ".join(map(_escape, headers)), ""]
+        implicit.append("headers")
+    implicit = " | " + " ".join(implicit) if implicit else ""
+    for mi, rule in ((True, "to_indented"), (False, "to_curly")):
+        lines += ["build %s: %s %s%s" % (_escape(o), rule, _escape(i), implicit) for o, i in edges[mi]]
+    lines.append("")
+
+    writeFile(fn_ninja + ".tmp", "\n".join(lines))
+    os.replace(fn_ninja + ".tmp", fn_ninja)
+    return len(edges[True]) + len(edges[False])
+
+
+def amalgamate(fns, include_path=(), macro_index=None):
+    """Convert sources of indented syntax into a single C/C++ source
+    for a unity build. Sources of curly braces syntax are copied as
+    they are.
+
+    Headers that are included with quotes and found are inlined in
+    place of their first include, and later includes of the same header
+    are dropped, as if every header had an include guard. Headers are
+    searched for as by MacroIndex.find_header(), so "foo.h" may refer
+    to "foo.ih". Every region of the output is preceded by a "#line"
+    directive that refers to the file it came from.
+
+    args:
+        fns: Filenames of sources, in the order of the output.
+            Directories are searched for sources of indented syntax.
+        include_path: Additional directories to search for headers.
+        macro_index: An optional MacroIndex for the conversions. Its
+            include path is then used to search for headers.
+
+    returns:
+        out_code: The amalgamated source code as a single string.
+    """
+
+    finder = macro_index or MacroIndex(include_path)
+    re_include = re.compile('^[ \t]*#[ \t]*include[ \t]*"([^"]+)"')
+    source_ext = [ext for ext, curly_ext in CURLY_EXT.items() if CC_LANGUAGES[curly_ext] in ("c", "c++")]
+
+    inlined = set()
+    out_code = []
+
+    def _quote(_fn):
+        return '"' + _fn.replace("\\", "\\\\").replace("\"", "\\\"") + '"'
+
+    def _lines(_fn):
+        # Lines of the converted file, each with its 0-based line number
+        # in the file, or None for lines that were added.
+        _raw_code = readFile(_fn)
+        if output_name(_fn, False)[0] is None:
+            _lines = _raw_code.split("\n")
+            if _lines[-1] == "":
+                _lines.pop()
+            return [("#line 1 " + _quote(_fn), None)] + [(_lines[n], n) for n in range(len(_lines))]
+        _macros = macro_index.names(_raw_code, _fn) if macro_index else None
+        _rows = convert_lines(_raw_code, False, line_file=_fn, macros=_macros)
+        return [(code_join([row], _raw_code), row[4]) for row in _rows]
+
+    def _emit(_fn):
+        inlined.add(_fn)
+        for line, ref in _lines(_fn):
+            r = re_include.search(line)
+            path = finder.find_header(r.group(1), _fn) if r else None
+            if path is None:
+                out_code.append(line)
+            elif path in inlined:
+                out_code.append("")
+            else:
+                _emit(path)
+                if ref is not None:
+                    out_code.append("#line %d %s" % (int(ref) + 2, _quote(_fn)))
+
+    for fn in source_files(fns, source_ext):
+        fn = os.path.normpath(fn)
+        if fn not in inlined:
+            _emit(fn)
+    return "\n".join(out_code) + "\n"
+
+
+def tokens(raw_code):
+    """Generate the tokens of C/C++ source code. White space, line
+    continuations, and comments are skipped.
+
+    yields:
+        token: The text of the token.
+        line_num: The line number of the token, starting from 1.
+        col_num: The column of the token, starting from 1.
+    """
+
+    re_token = re.compile(r"""
+        (?P<space>[ \t\r\f\v]+|\\\r?\n)
+        |(?P<newline>\n)
+        |(?P<comment>//[^\n]*|/\*.*?(\*/|$))
+        |(?P<string>"(\\.|[^"\\\n])*"?|'(\\.|[^'\\\n])*'?)
+        |(?P<name>[A-Za-z_][A-Za-z0-9_]*)
+        |(?P<number>\.?[0-9]([eEpP][+-]|[A-Za-z0-9_.])*)
+        |(?P<operator>::|->\*?|\.\.\.|<<=|>>=|<=>|\+\+|--|&&|\|\||<<|>>|\#\#|[-+*/%&|^!=<>]=|.)
+        """, re.X | re.S)
+
+    line_num = 1
+    line_start = 0
+    for r in re_token.finditer(raw_code):
+        kind = r.lastgroup
+        if kind == "newline":
+            line_num += 1
+            line_start = r.end()
+        elif kind in ("space", "comment"):
+            N = r.group().count("\n")
+            if N:
+                line_num += N
+                line_start = r.start() + r.group().rindex("\n") + 1
+        else:
+            yield r.group(), line_num, r.start() - line_start + 1
+
+
+def token_divergence(code_a, code_b):
+    """Compare the token streams of two pieces of C/C++ source code.
+    Tokens are compared as they are generated, so neither stream is held
+    in memory.
+
+    returns:
+        None if the token streams are equal, or else the first pair of
+        tokens that differ. Each token is (token, line_num, col_num), or
+        None if the stream ended early.
+    """
+
+    import itertools
+
+    for a, b in itertools.zip_longest(tokens(code_a), tokens(code_b)):
+        if a is None or b is None or a[0] != b[0]:
+            return a, b
+    return None
+
+
+def round_trip(fn):
+    """Convert a C/C++ source file into indented syntax and back, and
+    compare the tokens of the result with the tokens of the original.
+
+    returns:
+        report: None if the tokens are equal, or else a message that
+        describes the first difference.
+    """
+
+    try:
+        code_in = readFile(fn)
+        code_out = convert(convert(code_in, True), False)
+    except Exception as e:
+        return "%s: conversion failed: %s: %s" % (fn, type(e).__name__, e)
+
+    res = token_divergence(code_in, code_out)
+    if res == None:
+        return None
+    a, b = res
+    if a == None:
+        return "%s: end of file: round trip has extra token %r at %d:%d" % (fn, *b)
+    if b == None:
+        return "%s:%d:%d: round trip ends before token %r" % (fn, a[1], a[2], a[0])
+    return "%s:%d:%d: expected %r, round trip has %r at %d:%d" % (fn, a[1], a[2], a[0], *b)
+
+
+def verify_round_trip(paths, jobs=None, out=sys.stdout):
+    """Verify that C/C++ sources are unchanged, token for token, after
+    they are converted into indented syntax and back. Files are checked
+    in parallel.
+
+    args:
+        paths: Filenames and directories, which are searched for C/C++
+            sources.
+        jobs: The number of worker processes. Default is the number of
+            CPUs.
+        out: A stream for the report of each failing file.
+
+    returns:
+        failed: The number of files that failed.
+    """
+
+    fns = source_files(paths, INDENTED_EXT)
+    failed = 0
+    for report in parallel_map(round_trip, fns, jobs):
+        if report:
+            failed += 1
+            out.write(report + "\n")
+    out.write("%d files verified, %d failed\n" % (len(fns), failed))
+    return failed
+
+
+def build_zipapp(fn_out, interpreter="/usr/bin/env python3"):
+    """Build a single-file executable zip application of this module.
+    Besides the source, the zip contains bytecode that is compiled in
+    advance, so that the module is not compiled every time it is run.
+    The bytecode is only used by the same version of Python that built
+    it. Other versions fall back on the source.
+
+    args:
+        fn_out: The filename of the zip application, e.g. "thinc.pyz".
+        interpreter: The interpreter of the "#!" line.
+    """
+
+    import importlib.util
+    import marshal
+    import stat
+    import zipfile
+
+    def _pyc(_source, _name):
+        # The bytecode is never checked against the source, which is
+        # part of the same zip file.
+        _code = compile(_source, _name, "exec", dont_inherit=True, optimize=0)
+        _flags = (0b01).to_bytes(4, "little")
+        _hash = importlib.util.source_hash(_source.encode())
+        return importlib.util.MAGIC_NUMBER + _flags + _hash + marshal.dumps(_code)
+
+    source = readFile(__file__)
+    main_source = "import sys\nimport thinclib\nthinclib.main(sys.argv)\n"
+
+    with open(fn_out, "wb") as f:
+        f.write(("#!" + interpreter + "\n").encode())
+        with zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as z:
+            z.writestr("__main__.py", main_source)
+            z.writestr("__main__.pyc", _pyc(main_source, "__main__.py"))
+            z.writestr("thinclib.py", source)
+            z.writestr("thinclib.pyc", _pyc(source, "thinclib.py"))
+    os.chmod(fn_out, os.stat(fn_out).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def compile_thinc(cmd, macro_index=None):
+    """Run a C/C++ compiler on a command line that contains sources of
+    indented syntax. Each of them is converted in memory, and fed to the
+    compiler through stdin, with "#line" directives that refer to the
+    original file. The directory of the source is added to the quoted
+    include path, so that its local headers are still found. All other
+    arguments are passed to the compiler as they are. Since the output
+    is only read by the compiler, it is converted by convert_lean().
+
+    Local headers of indented syntax are converted in memory as well,
+    so they need not be converted on disk first. A header that is
+    included with quotes and found as by MacroIndex.find_header(), e.g.
+    "foo.ih" for "foo.h", in the directory of the including file or in
+    a "-I" or "-iquote" directory of the command line, is inlined in
+    place of its first include, with "#line" directives. Later includes
+    of the same header are dropped, as if it had an include guard.
+
+    A compiler reads at most one source from stdin, so the compiler is
+    run once for each source of indented syntax. When the command line
+    links, these runs compile into temporary object files, which are
+    then linked with the rest of the inputs.
+
+    With "-MD" or "-MMD", the compiler only sees stdin, so a rule for the
+    source and the headers that were inlined into it is appended to the
+    dependency file. Unless the command line names them, the file and
+    the target are passed as "-MF" and "-MQ": the output name with a
+    ".d" extension, or the name of the source when linking, and the
+    output file. With "-MP", the inlined headers get phony targets.
+
+    args:
+        cmd: The compiler command line, e.g. ["gcc", "-c", "foo.ic"].
+        macro_index: An optional MacroIndex for the conversions.
+
+    returns:
+        status: The exit status of the compiler.
+    """
+
+    import subprocess
+    import tempfile
+
+    options = [] # Arguments other than inputs, with their positions
+    inputs = []  # (position, filename) of each source of indented syntax
+    others = []  # Positions of the other inputs
+    fn_cc_out = None
+    isLinking = True
+    out_ext = ".o"
+    n = 1
+    while n < len(cmd):
+        arg = cmd[n]
+        if arg in CC_VALUE_OPTIONS:
+            if arg == "-o" and n + 1 < len(cmd):
+                fn_cc_out = cmd[n+1]
+            options.append((n, arg))
+            options += [(n+1, v) for v in cmd[n+1:n+2]]
+            n += 2
+            continue
+        if arg in ("-c", "-S", "-E"):
+            isLinking = False
+            out_ext = {"-c": ".o", "-S": ".s", "-E": None}[arg]
+        if arg[:1] != "-" and output_name(arg, False)[0]:
+            inputs.append((n, arg))
+        elif arg[:1] != "-":
+            others.append(n)
+        else:
+            options.append((n, arg))
+        n += 1
+
+    def _run(_args, _input=None):
+        try:
+            return subprocess.run(_args, input=_input).returncode
+        except OSError as e:
+            sys.stderr.write("thinc: %s: %s\n" % (_args[0], e.strerror))
+            return 127
+
+    def _quote(_fn):
+        # A filename as a make target or prerequisite.
+        return _fn.replace("$", "$$").replace("#", "\\#").replace(" ", "\\ ")
+
+    include_path = list(macro_index.include_path) if macro_index else []
+    isDeps = False
+    isPhony = False
+    fn_dep = None
+    targets = []
+    for n in range(len(options)):
+        pos, arg = options[n]
+        value = options[n+1][1] if n + 1 < len(options) and options[n+1][0] == pos + 1 else None
+        if arg in ("-I", "-iquote") and value is not None:
+            include_path.append(value)
+        elif arg[:2] == "-I" and len(arg) > 2:
+            include_path.append(arg[2:])
+        elif arg in ("-MD", "-MMD"):
+            isDeps = True
+        elif arg == "-MP":
+            isPhony = True
+        elif arg == "-MF" and value is not None:
+            fn_dep = value
+        elif arg == "-MT" and value is not None:
+            targets.append(value)
+        elif arg == "-MQ" and value is not None:
+            targets.append(_quote(value))
+    finder = MacroIndex(include_path)
+    re_include = re.compile('^[ \t]*#[ \t]*include[ \t]*"([^"]+)"')
+    re_line = re.compile('^#line ([0-9]+) ')
+
+    def _stdin_args(_fn, _dirs):
+        # Arguments that compile converted source read from stdin.
+        _lang = CC_LANGUAGES[os.path.splitext(output_name(_fn, False)[0])[1]]
+        _args = []
+        for _dir in _dirs:
+            _args += ["-iquote", _dir]
+        return _args + ["-x", _lang, "-", "-x", "none"]
+
+    def _dep_args(_fn, _output):
+        # Arguments that make the compiler write the dependencies of
+        # _fn, and the file and target to append the rule of _fn to.
+        if not isDeps:
+            return [], None, None
+        _args = []
+        _target = " ".join(targets)
+        if not targets:
+            _args += ["-MQ", _output]
+            _target = _quote(_output)
+        _fn_dep = fn_dep
+        if _fn_dep is None:
+            _fn_dep = os.path.splitext(os.path.basename(_fn) if isLinking else _output)[0] + ".d"
+            _args += ["-MF", _fn_dep]
+        return _args, _fn_dep, _target
+
+    def _add_deps(_fn_dep, _target, _files):
+        # Append the rule of a source and its inlined headers.
+        _rule = "%s: %s\n" % (_target, " ".join(_quote(_fn) for _fn in _files))
+        if isPhony:
+            _rule += "".join("%s:\n" % _quote(_fn) for _fn in _files[1:])
+        with open(_fn_dep, "a") as f:
+            f.write(_rule)
+
+    def _convert(_fn, _inlined, _dirs):
+        # The lines of a converted file, with the local headers of
+        # indented syntax that it includes.
+        _inlined[_fn] = True
+        if (os.path.dirname(_fn) or ".") not in _dirs:
+            _dirs.append(os.path.dirname(_fn) or ".")
+        _code = readFile(_fn)
+        _macros = macro_index.names(_code, _fn) if macro_index else None
+        _lines = []
+        _next = 1 # The line number of the next line in _fn
+        for _line in convert_lean(_code, False, line_file=_fn, macros=_macros).split("\n"):
+            r = re_line.search(_line)
+            if r:
+                _next = int(r.group(1)) - 1
+            r = re_include.search(_line)
+            _path = finder.find_header(r.group(1), _fn) if r else None
+            if _path is None or output_name(_path, False)[0] is None:
+                _lines.append(_line)
+            elif _path in _inlined:
+                _lines.append("")
+            else:
+                _lines += _convert(_path, _inlined, _dirs)
+                _lines.append('#line %d "%s"' % (_next + 1, _fn.replace("\\", "\\\\").replace("\"", "\\\"")))
+            _next += 1
+        return _lines
+
+    def _source(_fn):
+        # The converted source, the directories to search for the local
+        # headers that it includes, and the files that were read, i.e.
+        # _fn and its inlined headers.
+        _dirs = []
+        _inlined = {}
+        _lines = _convert(_fn, _inlined, _dirs)
+        return ("\n".join(_lines) + "\n").encode(), _dirs, list(_inlined)
+
+    def _object(_fn):
+        # The output file that the compiler names after _fn.
+        return os.path.splitext(os.path.basename(_fn))[0] + (out_ext or ".o")
+
+    if len(inputs) == 1:
+        # Convert the single source in place of its argument.
+        pos, fn = inputs[0]
+        data, dirs, files = _source(fn)
+        args = cmd[:pos] + _stdin_args(fn, dirs) + cmd[pos+1:]
+        if not isLinking and out_ext and fn_cc_out is None:
+            args += ["-o", _object(fn)]
+        if isLinking:
+            output = fn_cc_out or "a.out"
+        else:
+            output = fn_cc_out or _object(fn)
+        dep_args, fn_deps, target = _dep_args(fn, output)
+        status = _run(args + dep_args, data)
+        if not status and isDeps:
+            _add_deps(fn_deps, target, files)
+        return status
+
+    # Several sources: compile each one on its own, without the other
+    # inputs and without the output filename of the whole command.
+    inputs = set(inputs)
+    skip = set()
+    for pos, arg in options:
+        if arg == "-o":
+            skip.update((pos, pos + 1))
+    base_args = [cmd[0]] + [arg for pos, arg in options if pos not in skip]
+    if not isLinking and out_ext and fn_cc_out is not None:
+        sys.stderr.write("thinc: cannot specify -o with -c, -S or -E with multiple files\n")
+        return 1
+
+    with tempfile.TemporaryDirectory(prefix="thinc-cc-") as tmp_dir:
+        objects = {}
+        for pos, fn in sorted(inputs):
+            data, dirs, files = _source(fn)
+            args = base_args + _stdin_args(fn, dirs)
+            if isLinking:
+                objects[pos] = os.path.join(tmp_dir, "%d.o" % pos)
+                args += ["-c", "-o", objects[pos]]
+            elif out_ext:
+                args += ["-o", _object(fn)]
+            dep_args, fn_deps, target = _dep_args(fn, (fn_cc_out or "a.out") if isLinking else _object(fn))
+            status = _run(args + dep_args, data)
+            if status:
+                return status
+            if isDeps:
+                _add_deps(fn_deps, target, files)
+
+        if isLinking or others:
+            args = [cmd[0]]
+            for n in range(1, len(cmd)):
+                if n in objects:
+                    args.append(objects[n])
+                elif (n, cmd[n]) not in inputs:
+                    args.append(cmd[n])
+            return _run(args)
+    return 0
+
+
+def report_telemetry(telemetry, fn_stats=None, top=10):
+    """Print the report of a multi-file run to stderr, unless no file
+    was converted, and optionally write its counters into a file."""
+
+    if telemetry.files:
+        sys.stderr.write(telemetry.report(top))
+    if fn_stats:
+        telemetry.write(fn_stats, top)
+
+
+def main(argv):
+    """A compiler to convert C/C++ back and forth between the
+    traditional syntax and another indentation-based Pythonic syntax.
+
+    Usage:
+        python3 thinc.py -i InputFileName -o OutputFileName
+        python3 -m thinc -i InputFileName -o OutputFileName
+        ./thinc.pyz -i InputFileName -o OutputFileName
+
+        python3 thinc.py -i Inpute.c -o Output.ic
+        python3 thinc.py -i Inpute.ic -o Output.c -c
+        python3 thinc.py -i Inpute.c
+        python3 thinc.py -i Inpute.ic -o Output.c -l -m Output.c.map
+        cat Inpute.ic | python3 thinc.py
+
+    args:
+        -i: The input filename. Default is stdin.
+        -o: The output filename. Default is stdout.
+        -c: Force conversion to curly bracket syntax (C/C++ syntax).
+        -p: Force conversion to indented syntax (Pythonic syntax).
+        -l: Add "#line" directives to C/C++ output, so that compiler
+            errors refer to the lines of the input file.
+        -m: Write a source map of output lines to input lines into the
+            given filename.
+        --lean: Write output that is only meant for a compiler, without
+            comments and cosmetic changes, which converts faster. Lines
+            keep their line numbers where possible, and "-l" adds
+            "#line" directives where they do not.
+
+        --macros: Find macros that expand to statements or block
+            delimiters in the input and in the headers that it
+            includes. Lines that only use such a macro are left
+            without a semi-colon.
+        -I: Add a directory to the include path of --macros. Implies
+            --macros.
+        -j: The number of worker processes for multi-file modes.
+        --stats: Write the throughput counters of a multi-file run into
+            the given filename, as JSON if it ends with ".json", and in
+            the Prometheus text format otherwise.
+        --top: The number of slowest files listed in the report of a
+            multi-file run. Default is 10.
+        --check: Verify that the output is what the conversion of the
+            input would produce, without writing anything. The input and
+            output may be files or directories. Stale outputs are listed,
+            and the exit status is nonzero if there are any.
+        --zipapp: Build a single-file zip application with precompiled
+            bytecode into the given filename, e.g. thinc.pyz.
+        --verify: Verify that the C/C++ files and directories given with
+            -i are unchanged, token for token, after a round trip
+            through indented syntax. The exit status is nonzero if any
+            file failed.
+        --outline: Write the functions, types, namespaces, and access
+            sections of the input with their line ranges, instead of
+            converting it.
+        --emit-ninja: Write a ninja build file with the given filename,
+            which converts the input directory into the output
+            directory, one edge per file, instead of converting it.
+        --if-changed: Leave the output file untouched if its content
+            would not change, e.g. for the "restat" of ninja.
+        --trees: Convert a single input file from its cached tree
+            snapshot, which is stored in the directory ".thinc-tree"
+            next to it, see tree_snapshot().
+        --amalgamate: Convert all inputs given with -i into a single
+            C/C++ source for a unity build, with local headers inlined.
+            Directories are searched for sources of indented syntax.
+        --cc: Run the C/C++ compiler command that follows, see below.
+
+    Compiler wrapper:
+        python3 thinc.py --cc gcc -Wall -c Inpute.ic
+        thinc-cc g++ -O2 Inpute.icpp Other.cpp -o Program
+
+    Everything after --cc is a compiler command line. Its sources of
+    indented syntax are converted in memory and piped into the compiler,
+    with "#line" directives, so that errors refer to the original
+    lines. Local headers of indented syntax that they include with
+    quotes, e.g. "foo.h" for foo.ih, are converted in memory as well.
+    With -MD or -MMD, the dependency files list the sources and these
+    headers. All other arguments are passed through. Run as "thinc-cc",
+    e.g. through a symbolic link, all arguments form the compiler
+    command line.
+
+    thinc.py only launches thinclib.py, which is imported from its
+    cached bytecode, so that a run does not compile it again. Where the
+    cache can not be written, thinclib.py is compiled on every run, and
+    the zip application, which contains the bytecode, starts several
+    times faster, although it is slower than a cached import.
+
+    If the input is a directory, all of its source files are converted
+    into the output directory. Headers are converted before the files
+    that include them, and files that are up to date since the last run
+    are skipped.
+
+    Converting a directory or an archive prints a throughput report to
+    stderr, which lists the slowest files.
+
+    If the input is a zip or tar archive, its source files are converted
+    into a new archive, which is written to the output filename. Source
+    files are recognized by their filename extensions, which are changed
+    to match the new syntax, e.g. ".c" to ".ic" and ".ic" to ".c".
+    """
+
+    make_indented = None
+    fn_ins = []
+    fn_out = None
+    fn_map = None
+    line_directives = False
+    jobs = None
+    verify = False
+    check = False
+    macro_index = None
+    include_path = []
+    fn_stats = None
+    top = 10
+    lean = False
+    isOutline = False
+    isAmalgamation = False
+    trees = False
+    fn_ninja = None
+    isIfChanged = False
+
+    cc = None
+    if os.path.basename(argv[0]).startswith("thinc-cc"):
+        argv, cc = argv[:1], argv[1:]
+    elif "--cc" in argv:
+        n = argv.index("--cc")
+        argv, cc = argv[:n], argv[n+1:]
+
+    for n in range(len(argv)):
+        try:
+            if argv[n] == "-c":
+                make_indented = False
+            elif argv[n] == "-p":
+                make_indented = True
+            elif argv[n] == "-i":
+                fn_ins.append(argv[n+1])
+            elif argv[n] == "-o":
+                fn_out = argv[n+1]
+            elif argv[n] == "-l":
+                line_directives = True
+            elif argv[n] == "--lean":
+                lean = True
+            elif argv[n] == "--outline":
+                isOutline = True
+            elif argv[n] == "--amalgamate":
+                isAmalgamation = True
+            elif argv[n] == "--trees":
+                trees = True
+            elif argv[n] == "--emit-ninja":
+                fn_ninja = argv[n+1]
+            elif argv[n] == "--if-changed":
+                isIfChanged = True
+            elif argv[n] == "-m":
+                fn_map = argv[n+1]
+            elif argv[n] == "-j":
+                jobs = int(argv[n+1])
+            elif argv[n] == "--verify":
+                verify = True
+            elif argv[n] == "--check":
+                check = True
+            elif argv[n] == "--stats":
+                fn_stats = argv[n+1]
+            elif argv[n] == "--top":
+                top = int(argv[n+1])
+            elif argv[n] == "--zipapp":
+                build_zipapp(argv[n+1])
+                return
+            elif argv[n] == "--macros":
+                macro_index = True
+            elif argv[n] == "-I":
+                include_path.append(argv[n+1])
+                macro_index = True
+        except IndexError:
+            pass
+
+    if macro_index:
+        macro_index = MacroIndex(include_path)
+
+    if cc is not None:
+        if not cc:
+            sys.exit("thinc: --cc requires a compiler command line")
+        sys.exit(compile_thinc(cc, macro_index))
+
+    if verify:
+        sys.exit(verify_round_trip(fn_ins, jobs) > 0)
+
+    if isAmalgamation:
+        if not fn_ins:
+            sys.exit("thinc: --amalgamate requires at least one input (-i)")
+        new_lines = amalgamate(fn_ins, include_path, macro_index)
+        if fn_out:
+            writeFile(fn_out, new_lines)
+        else:
+            sys.stdout.write(new_lines)
+        return
+
+    fn_in = fn_ins[-1] if fn_ins else None
+
+    if fn_ninja:
+        if not (fn_in and fn_out and os.path.isdir(fn_in)):
+            sys.exit("thinc: --emit-ninja requires an input directory (-i) and an output directory (-o)")
+        emit_ninja(fn_in, fn_out, fn_ninja, make_indented,
+            macro_index.include_path if macro_index else None, [sys.executable, os.path.abspath(argv[0])])
+        return
+
+    if check:
+        if not (fn_in and fn_out):
+            sys.exit("thinc: --check requires an input (-i) and an output (-o)")
+        if os.path.isdir(fn_in):
+            telemetry = Telemetry()
+            stale, checked = check_project(fn_in, fn_out, make_indented, jobs, macro_index, telemetry)
+            report_telemetry(telemetry, fn_stats, top)
+        else:
+            macros = macro_index.names(readFile(fn_in), fn_in) if macro_index else None
+            isFresh, record = check_file((fn_in, fn_out, make_indented, macros))
+            stale, checked = [] if isFresh else [fn_out], 1
+        for fn in stale:
+            sys.stdout.write(fn + "\n")
+        sys.stderr.write("%d of %d outputs are stale\n" % (len(stale), checked))
+        sys.exit(bool(stale))
+
+    if fn_in and os.path.isdir(fn_in):
+        if not fn_out:
+            sys.exit("thinc: an output directory (-o) is required to convert a directory")
+        telemetry = Telemetry()
+        convert_project(fn_in, fn_out, make_indented, jobs, macro_index, telemetry)
+        report_telemetry(telemetry, fn_stats, top)
+        return
+
+    if fn_in and isArchive(fn_in):
+        if not fn_out:
+            sys.exit("thinc: an output archive (-o) is required to convert an archive")
+        cache = LRUCache()
+        telemetry = Telemetry(cache)
+        convert_archive(fn_in, fn_out, make_indented, cache, telemetry)
+        report_telemetry(telemetry, fn_stats, top)
+        return
+
+    if fn_in:
+        code_in = readFile(fn_in)
+    else:
+        code_in = sys.stdin.read()
+
+    if make_indented == None:
+        make_indented, confidence = detect_syntax(code_in, fn_in)
+        if make_indented == None and confidence:
+            sys.exit("thinc: %s: mixed or ambiguous syntax (%.0f%% confidence), "
+                "use -c or -p to choose the conversion" % (fn_in or "<stdin>", 100*confidence))
+
+    if isOutline:
+        new_lines = "".join(["%s%s %s %d-%d\n" % (" "*IND_AMT*depth, kind, name, first, last)
+            for kind, name, first, last, depth in outline(code_in, make_indented)])
+        if fn_out:
+            writeFile(fn_out, new_lines)
+        else:
+            sys.stdout.write(new_lines)
+        return
+
+    line_file = None
+    if line_directives:
+        line_file = fn_in or "<stdin>"
+
+    macros = None
+    if macro_index:
+        macros = macro_index.names(code_in, fn_in)
+
+    if lean:
+        if fn_map:
+            sys.exit("thinc: a source map (-m) cannot be written with --lean")
+        new_lines = convert_lean(code_in, make_indented, line_file, macros)
+    elif trees and fn_in:
+        snapshot, code_in = tree_snapshot(fn_in, make_indented, macros)
+        out_lines = convert_tree(snapshot, code_in, line_file)
+        new_lines = code_join(out_lines, code_in)
+    else:
+        out_lines = convert_lines(code_in, make_indented, line_file, macros=macros)
+        new_lines = code_join(out_lines, code_in)
+
+    if fn_map:
+        smap = source_map(out_lines)
+        writeFile(fn_map, source_map_dumps(smap, fn_in or "<stdin>", fn_out or "<stdout>"))
+
+    if fn_out:
+        if not (isIfChanged and text_matches_file(new_lines, fn_out)):
+            writeFile(fn_out, new_lines)
+    else:
+        sys.stdout.write(new_lines)
+
+
+if __name__ == "__main__":
+    main(sys.argv)